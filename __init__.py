@@ -10,17 +10,32 @@ import sys, os
 import gettext
 import json
 import datetime
-from urllib.parse import urlencode
+import bisect
+import sqlite3
+import ssl
+import threading
+import time
+import zlib
+import html
+import http.client
+from email.message import Message
+from urllib.parse import urlencode, urlsplit, urlunsplit, urljoin, parse_qsl, quote, unquote
+from urllib.request import getproxies, proxy_bypass
 from datetime import datetime, timedelta
 from dateutil import parser
 from queue import Empty, Queue
-from bs4 import BeautifulSoup
+from collections import Counter, OrderedDict
+from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from bs4 import BeautifulSoup, SoupStrainer
+import mechanize
 from calibre.ebooks.metadata import authors_to_string, author_to_author_sort, title_sort
 # from calibre.library.field_metadata import FieldMetadata
 from calibre.ebooks.metadata.book.base import NULL_VALUES
 # from calibre.ebooks.metadata.book.base import get as get_meta_field, get_extra as get_extra_meta_field
 from calibre.ebooks.metadata.meta import get_metadata
 from calibre.ebooks.metadata.sources.base import Source, Option
+from calibre.constants import cache_dir
 from calibre.gui2.book_details import *
 
 __license__ = 'GPL v3'
@@ -191,6 +206,1021 @@ def get_key(d, val, exact=False):
     return None
 
 
+def normalize_series_name(text):
+    return ' '.join(text.casefold().split())
+
+
+class SeriesNameIndex(object):
+    """
+    Resolves a series name to its code, like get_key(d, val, exact=False), but without a scan over all names:
+    an exact lookup of the normalized name first, then one pass of an Aho-Corasick automaton over the text, that
+    finds all names contained in it. The longest contained name wins ("Perry Rhodan-Mission SOL 2" before
+    "Perry Rhodan-Mission SOL"), for names of the same length the first code of d.
+    """
+
+    def __init__(self, d):
+        self.exact = {}
+        self.goto = [{}]  # node -> {character: node}
+        self.output = [None]  # node -> (length, -priority, code) of the longest name ending at that node
+        for priority, (code, name) in enumerate(d.items()):
+            name = normalize_series_name(name)
+            if not name:
+                continue
+            self.exact.setdefault(name, code)
+            node = 0
+            for character in name:
+                if character not in self.goto[node]:
+                    self.goto.append({})
+                    self.output.append(None)
+                    self.goto[node][character] = len(self.goto) - 1
+                node = self.goto[node][character]
+            if self.output[node] is None:
+                self.output[node] = (len(name), -priority, code)
+        # Failure links in breadth-first order, the output of a node includes the outputs of its failure chain
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for character, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and character not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(character, 0)
+                self.output[child] = max(filter(None, (self.output[child], self.output[self.fail[child]])),
+                                         default=None)
+                queue.append(child)
+
+    def find(self, text):
+        """
+        Returns the code of the series name in text, or None.
+        """
+        text = normalize_series_name(text or '')
+        if text in self.exact:
+            return self.exact[text]
+        best = None
+        node = 0
+        for character in text:
+            while node and character not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(character, 0)
+            if self.output[node] is not None and (best is None or self.output[node] > best):
+                best = self.output[node]
+        return best[2] if best is not None else None
+
+
+def split_wiki_params(text):
+    """
+    Split the inner text of a wiki template at the pipes on the top level (not inside of nested templates,
+    links or tables).
+    """
+    parts = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(text):
+        pair = text[i:i + 2]
+        if pair in ('{{', '[['):
+            depth = depth + 1
+            i = i + 2
+            continue
+        if pair in ('}}', ']]'):
+            depth = max(0, depth - 1)
+            i = i + 2
+            continue
+        if text[i] == '|' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse_wiki_templates(wikitext):
+    """
+    Return the templates on the top level of wikitext as list of (name, {parameter: value}).
+    Positional parameters get the keys '1', '2', ...
+    """
+    templates = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(wikitext):
+        pair = wikitext[i:i + 2]
+        if pair == '{{':
+            if depth == 0:
+                start = i + 2
+            depth = depth + 1
+            i = i + 2
+            continue
+        if pair == '}}' and depth > 0:
+            depth = depth - 1
+            if depth == 0:
+                parts = split_wiki_params(wikitext[start:i])
+                params = {}
+                position = 0
+                for part in parts[1:]:
+                    name, sep, value = part.partition('=')
+                    if sep and '{{' not in name and '[[' not in name:
+                        params[name.strip()] = value.strip()
+                    else:
+                        position = position + 1
+                        params[str(position)] = part.strip()
+                templates.append((parts[0].strip(), params))
+            i = i + 2
+            continue
+        i = i + 1
+    return templates
+
+
+def strip_wiki_markup(text):
+    """
+    Convert a wikitext value to plain text, like the rendered page: links to their labels, line breaks to ' | ',
+    list items to a comma-seperated string, no formatting, references or html tags.
+    """
+    text = re.sub(r'<!--.*?-->', '', text, flags=re.S)
+    text = re.sub(r'<ref[^>]*/>|<ref[^>]*>.*?</ref>', '', text, flags=re.S | re.I)
+    text = re.sub(r'<br\s*/?>', ' | ', text, flags=re.I)
+    # Nested templates (innermost first): show the last positional parameter
+    while True:
+        match = re.search(r'\{\{([^{}]*)\}\}', text)
+        if match is None:
+            break
+        params = [param for param in match.group(1).split('|')[1:] if '=' not in param]
+        text = text[:match.start()] + (params[-1] if params else '') + text[match.end():]
+    text = re.sub(r'\[\[(?:Datei|File|Bild|Image):[^\]]*\]\]', '', text, flags=re.I)
+    text = re.sub(r'\[\[[^\]|]*\|([^\]]*)\]\]', r'\1', text)
+    text = re.sub(r'\[\[([^\]]*)\]\]', r'\1', text)
+    text = re.sub(r'\[(?:https?:)?//[^\s\]]+\s+([^\]]*)\]', r'\1', text)
+    text = re.sub(r"'{2,}", '', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    items = [line.lstrip('*#: ').strip() for line in text.split('\n') if line.lstrip().startswith(('*', '#'))]
+    if items:
+        text = ', '.join(items)
+    text = html.unescape(text).replace('\xa0', ' ').replace('\n', ' ')
+    text = re.sub(r'\s+', ' ', text)
+    while text.find(' |  | ') > -1:
+        text = text.replace(' |  | ', ' | ')
+    return text.strip().strip('|').strip()
+
+
+def required_literals(pattern):
+    """
+    Return the literal strings (casefolded) one of which must occur in a text, if pattern can match it, or None,
+    if that can not be told (then the pattern has to be tried always). One literal per top level alternative:
+    the longest run of plain characters outside of classes, optional parts and nested alternatives.
+    """
+    branches = []
+    runs = []  # required runs of the current branch
+    run = ''
+    stack = []  # per open group: [len(runs) at the open, has alternative]
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        quantified = i + 1 < len(pattern) and pattern[i + 1] in '?*+{'
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i = i + 2
+            quantified = i < len(pattern) and pattern[i] in '?*+{'
+            if escaped.isalnum():  # \d, \b, \w, ...
+                runs.append(run)
+                run = ''
+            elif quantified:
+                runs.append(run)
+                run = ''
+            else:
+                run = run + escaped
+            continue
+        if char == '[':
+            runs.append(run)
+            run = ''
+            i = pattern.index(']', i + 2 if pattern[i + 1:i + 2] in (']', '^') else i + 1) + 1
+            continue
+        if char == '(':
+            runs.append(run)
+            run = ''
+            stack.append([len(runs), False])
+            if pattern[i + 1:i + 2] == '?':
+                i = pattern.index(':', i) + 1 if pattern[i + 2:i + 3] == ':' else pattern.index(')', i) + 1
+                if pattern[i - 1] == ')':  # inline flags like (?i)
+                    stack.pop()
+                continue
+            i = i + 1
+            continue
+        if char == ')':
+            runs.append(run)
+            run = ''
+            start, alternative = stack.pop() if stack else (len(runs), True)
+            quantified = i + 1 < len(pattern) and pattern[i + 1] in '?*+{'
+            if alternative or quantified:
+                del runs[start:]
+            i = i + 1
+            continue
+        if char == '|':
+            runs.append(run)
+            run = ''
+            if stack:
+                stack[-1][1] = True
+            else:
+                branches.append(runs)
+                runs = []
+            i = i + 1
+            continue
+        if char in '.^$':
+            runs.append(run)
+            run = ''
+            i = i + 1
+            continue
+        if char in '?*+':
+            i = i + 1
+            continue
+        if char == '{':
+            i = pattern.index('}', i) + 1
+            continue
+        if quantified:
+            runs.append(run)
+            run = ''
+        else:
+            run = run + char
+        i = i + 1
+    runs.append(run)
+    branches.append(runs)
+    literals = []
+    for runs in branches:
+        longest = max(runs, key=len) if runs else ''
+        if not longest.strip():
+            return None
+        literals.append(longest.casefold())
+    return literals
+
+
+class SeriesMatcher(object):
+    """
+    Prioritized matcher for a table of (key, regular expression): the patterns are compiled once (case
+    insensitive) and tried in the order of the table, the first match wins.
+    A pattern is only tried, if one of its required literals (e. g. "atlan", "silberband") occurs in the text.
+    """
+
+    def __init__(self, table):
+        self.patterns = []
+        for key, pattern in table:
+            literals = required_literals(pattern)
+            self.patterns.append((key, re.compile(pattern, re.IGNORECASE),
+                                  None if literals is None else frozenset(literals)))
+        # All literals are found with one scan: at each position the longest literal matches, the literals that
+        # are prefixes of it are present, too.
+        literals = set()
+        for key, regex, pattern_literals in self.patterns:
+            literals.update(pattern_literals or ())
+        literals = sorted(literals, key=len, reverse=True)
+        self.prefixes = dict((literal, frozenset(other for other in literals if literal.startswith(other)))
+                             for literal in literals)
+        self.literal_scan = re.compile('(?=(' + '|'.join(re.escape(literal) for literal in literals) + '))') \
+            if literals else None
+
+    def search(self, text):
+        """
+        Return (key, match) for the first pattern matching text or (None, None).
+        """
+        present = set()
+        if self.literal_scan is not None:
+            for literal in set(self.literal_scan.findall(text.casefold())):
+                present.update(self.prefixes[literal])
+        for key, regex, literals in self.patterns:
+            if literals is not None and literals.isdisjoint(present):
+                continue
+            match = regex.search(text)
+            if match:
+                return key, match
+        return None, None
+
+
+class CycleIndex(object):
+    """
+    Sorted start numbers of the cycles ("Zyklen") of every series, built from rows like subseries_offsets
+    [cycle name, series code, first issue, pattern]. Finds the cycle of an issue and the offset of a cycle by
+    bisection resp. dictionary lookup instead of a scan over all rows. A cycle ends where the next one of the same
+    series starts, the last cycle of a series is open-ended.
+    """
+
+    def __init__(self, rows):
+        starts = {}
+        self.offsets = {}
+        for row in rows:
+            name, series_code, first_issue = row[0], row[1], row[2]
+            self.offsets.setdefault((series_code, name.casefold()), first_issue)
+            starts.setdefault(series_code, {}).setdefault(first_issue, name)  # first row wins, like the patterns
+        self.starts = {}
+        self.names = {}
+        for series_code, cycles in starts.items():
+            self.starts[series_code] = sorted(cycles)
+            self.names[series_code] = [cycles[first_issue] for first_issue in self.starts[series_code]]
+
+    def cycle(self, series_code, issuenumber):
+        """
+        Returns (cycle name, first issue of the cycle) for an issue of a series, or (None, None).
+        """
+        starts = self.starts.get(series_code)
+        try:
+            position = bisect.bisect_right(starts, int(issuenumber)) - 1 if starts else -1
+        except (TypeError, ValueError):
+            position = -1
+        if position < 0:
+            return None, None
+        return self.names[series_code][position], starts[position]
+
+    def offset(self, series_code, name):
+        """
+        Returns the first issue of the named cycle of a series, or None.
+        """
+        return self.offsets.get((series_code, (name or '').casefold()))
+
+
+try:
+    import lxml  # noqa: F401 (bundled with calibre)
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# The parts of the Perrypedia pages, that the plugin reads. Everything else (head, navigation, sidebars, footer)
+# is skipped by the parser.
+PAGE_PARTS = {
+    # Book pages: heading, overview frame and sections
+    'book': SoupStrainer(id=['firstHeading', 'mw-content-text']),
+    'heading': SoupStrainer(id='firstHeading'),
+    # File: pages of the covers
+    'cover': SoupStrainer('div', attrs={'class': ['fullMedia', 'fullImageLink']}),
+    # Tables of the foreign issues and cycles
+    'table': SoupStrainer('table', attrs={'class': 'perrypedia_std_table'}),
+}
+
+
+def parse_html(page, parts=None):
+    """
+    Parse a page with lxml (html.parser, if lxml is not available). parts is a key of PAGE_PARTS, to parse only
+    these parts of the page.
+    """
+    return BeautifulSoup(page, HTML_PARSER, parse_only=PAGE_PARTS[parts] if parts else None)
+
+
+def page_heading(soup):
+    """
+    The heading (page title without " – Perrypedia") of a parsed Perrypedia page.
+    """
+    heading = soup.find(id='firstHeading') if soup is not None else None
+    return heading.get_text().strip() if heading is not None else ''
+
+
+def heading_level(tag):
+    """
+    The level of a MediaWiki section heading (<h2>, or <div class="mw-heading mw-heading2"><h2> in newer versions),
+    None for other tags.
+    """
+    name = getattr(tag, 'name', None)
+    if name is None:
+        return None
+    if name == 'div' and 'mw-heading' in (tag.get('class') or []):
+        tag = tag.find(re.compile(r'^h[1-6]$'), recursive=False)
+        name = tag.name if tag is not None else ''
+    if re.match(r'^h[1-6]$', name):
+        return int(name[1])
+    return None
+
+
+def section_tags(soup, section_id=None, names=('p', 'dl')):
+    """
+    The tags (names) of a section of a parsed MediaWiki page, from its heading up to the next heading of the same or
+    a higher level. The rest of the page is not visited. Without section_id, the first section on level 2.
+    """
+    anchor = soup.find(id=section_id) if section_id else soup.find('h2')
+    if anchor is None:
+        return []
+    # <h2><span class="mw-headline" id="Handlung">Handlung</span></h2> or <h2 id="Handlung">Handlung</h2>
+    heading = anchor if heading_level(anchor) else anchor.find_parent(re.compile(r'^h[1-6]$'))
+    if heading is None:
+        return []
+    level = heading_level(heading)
+    if heading_level(heading.parent):  # wrapper <div class="mw-heading">
+        heading = heading.parent
+    tags = []
+    for sibling in heading.next_siblings:
+        sibling_level = heading_level(sibling)
+        if sibling_level is not None and sibling_level <= level:
+            break
+        if getattr(sibling, 'name', None) in names:
+            tags.append(sibling)
+    return tags
+
+
+def page_title_from_url(url):
+    """
+    The page title of a Perrypedia url (/wiki/Quelle:PR1433 or index.php?title=Quelle:PR1433&redirect=yes), or None.
+    """
+    parts = urlsplit(url)
+    page_title = dict(parse_qsl(parts.query)).get('title')
+    if page_title is None and '/wiki/' in parts.path:
+        page_title = unquote(parts.path.split('/wiki/', 1)[1])
+    return page_title or None
+
+
+def normalize_url(url):
+    """
+    Normalize an url for the use as cache key: lower case scheme and host, no fragment, sorted query parameters and
+    uniform percent encoding (the urls in this plugin are built with and without encoding, e. g. the opensearch url).
+    """
+    parts = urlsplit(url.strip())
+    path = quote(unquote(parts.path), safe="/:()!,;'*@$&+=~-._")
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+class ResponseCache(object):
+    """
+    Persistent cache for http responses, stored in a SQLite database in calibre's cache directory.
+    Keys are normalized urls. Each entry has its own expiry time, the total size of all responses is capped and
+    the least recently used entries are evicted first.
+    Expired entries are kept with their validators (ETag, Last-Modified), so they can be revalidated with a
+    conditional request.
+    """
+
+    def __init__(self, path, max_size, ttl):
+        self.path = path
+        self.max_size = max_size  # bytes
+        self.ttl = ttl  # seconds
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0  # by revalidation
+        self._conn = None
+
+    def _connection(self):
+        # This must only be called once we have the lock
+        if self._conn is None:
+            dirname = os.path.dirname(self.path)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, url TEXT, body BLOB, '
+                         'size INTEGER, fetched REAL, expires REAL, accessed REAL)')
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(responses)')]
+            for column, column_type in (('etag', 'TEXT'), ('last_modified', 'TEXT'), ('saved', 'INTEGER DEFAULT 0')):
+                if column not in columns:
+                    conn.execute('ALTER TABLE responses ADD COLUMN {0} {1}'.format(column, column_type))
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            # Canonical page titles of the ppids ("Quelle:" redirects), not limited by size or lifetime
+            conn.execute('CREATE TABLE IF NOT EXISTS redirects (ppid TEXT PRIMARY KEY, title TEXT, updated REAL)')
+            # Lookups known to fail (unknown ppids, searches without hits), with their own shorter lifetime
+            conn.execute('CREATE TABLE IF NOT EXISTS failures (kind TEXT, key TEXT, expires REAL, '
+                         'PRIMARY KEY (kind, key))')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, url):
+        """
+        Return the cached body for url or None, if there is no entry or the entry is expired.
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self.lock:
+            conn = self._connection()
+            row = conn.execute('SELECT body, expires FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] < now:
+                self.misses = self.misses + 1
+                return None
+            conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+            conn.commit()
+            self.hits = self.hits + 1
+            return bytes(row[0])
+
+    def get_entry(self, url):
+        """
+        Return (body, expires, etag, last_modified, fetched) for url, expired or not, or None if there is no entry.
+        """
+        with self.lock:
+            row = self._connection().execute('SELECT body, expires, etag, last_modified, fetched FROM responses '
+                                             'WHERE key = ?', (normalize_url(url),)).fetchone()
+        if row is None:
+            return None
+        return bytes(row[0]), row[1], row[2], row[3], row[4]
+
+    def put(self, url, body, ttl=None, etag=None, last_modified=None):
+        if ttl is None:
+            ttl = self.ttl
+        key = normalize_url(url)
+        now = time.time()
+        with self.lock:
+            conn = self._connection()
+            conn.execute('INSERT OR REPLACE INTO responses (key, url, body, size, fetched, expires, accessed, etag, '
+                         'last_modified, saved) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, '
+                         'COALESCE((SELECT saved FROM responses WHERE key = ?), 0))',
+                         (key, url, sqlite3.Binary(body), len(body), now, now + ttl, now, etag, last_modified, key))
+            conn.commit()
+            self.evict()
+
+    def revalidated(self, url, saved, ttl=None):
+        """
+        Renew an entry after the server confirmed it with '304 Not Modified' and record the saved bytes.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        now = time.time()
+        with self.lock:
+            conn = self._connection()
+            conn.execute('UPDATE responses SET expires = ?, accessed = ?, saved = saved + ? WHERE key = ?',
+                         (now + ttl, now, saved, normalize_url(url)))
+            conn.commit()
+            self.bytes_saved = self.bytes_saved + saved
+
+    def get_redirect(self, ppid):
+        """
+        Return the canonical page title of a ppid or None, if the redirect was not followed yet.
+        """
+        with self.lock:
+            row = self._connection().execute('SELECT title FROM redirects WHERE ppid = ?', (ppid,)).fetchone()
+        return row[0] if row else None
+
+    def put_redirect(self, ppid, title):
+        with self.lock:
+            conn = self._connection()
+            conn.execute('INSERT OR REPLACE INTO redirects (ppid, title, updated) VALUES (?, ?, ?)',
+                         (ppid, title, time.time()))
+            conn.commit()
+
+    def remove_redirect(self, ppid):
+        with self.lock:
+            conn = self._connection()
+            conn.execute('DELETE FROM redirects WHERE ppid = ?', (ppid,))
+            conn.commit()
+
+    def is_failure(self, kind, key):
+        """
+        Return True, if the lookup of kind (e. g. 'isfdb') for key failed before and the entry is not expired.
+        """
+        with self.lock:
+            row = self._connection().execute('SELECT expires FROM failures WHERE kind = ? AND key = ?',
+                                             (kind, key)).fetchone()
+        return row is not None and row[0] >= time.time()
+
+    def put_failure(self, kind, key, ttl, url=None):
+        """
+        Record a failed lookup for ttl seconds. The response of url (the page without results) is removed, so it is
+        downloaded again when the failure expires and not served from the cache for the full cache lifetime.
+        """
+        now = time.time()
+        with self.lock:
+            conn = self._connection()
+            conn.execute('INSERT OR REPLACE INTO failures (kind, key, expires) VALUES (?, ?, ?)',
+                         (kind, key, now + ttl))
+            conn.execute('DELETE FROM failures WHERE expires < ?', (now,))
+            if url is not None:
+                conn.execute('DELETE FROM responses WHERE key = ?', (normalize_url(url),))
+            conn.commit()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is below 90 % of its size limit.
+        """
+        with self.lock:
+            conn = self._connection()
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total <= self.max_size:
+                return
+            limit = self.max_size * 0.9
+            for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed').fetchall():
+                if total <= limit:
+                    break
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                total = total - size
+            conn.commit()
+
+
+def title_key(title):
+    """
+    Normalize a page title for lookups in the title index.
+    """
+    return ' '.join(title.replace('_', ' ').split()).casefold()
+
+
+TITLE_FOLDING = str.maketrans({'ß': 'ss', 'ä': 'ae', 'ö': 'oe', 'ü': 'ue', '_': ' ', '-': ' ', '\u2010': ' ',
+                               '\u2011': ' ', '\u2012': ' ', '\u2013': ' ', '\u2014': ' ', '\u2015': ' ',
+                               '\u2212': ' '})
+
+
+def fold_title(title):
+    """
+    Normalize a title for fuzzy matching: casefolded, umlauts and ß transliterated, dashes and underscores as
+    spaces, no punctuation.
+    """
+    title = title.casefold().translate(TITLE_FOLDING)
+    return ' '.join(re.sub(r'[^\w ]', ' ', title).split())
+
+
+def trigrams(folded):
+    padded = ' ' + folded + ' '
+    return set(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TitleMatcher(object):
+    """
+    Fuzzy matcher over all known book titles with a trigram index.
+    The score of a title combines the similarity with the query (Dice coefficient of the trigrams) and the part
+    of the title found in the query, so a title hidden in a file name ("Perry-Rhodan-3225-Der-Mann-aus-Glas")
+    gets a high score, too. Only titles sharing a rare trigram with the query are scored.
+    The titles are numbered by their number of trigrams, so the posting lists are sorted by title size and the
+    titles too short or too long to reach the minimum score are cut off with bisect before counting.
+    """
+
+    max_posting_share = 0.05  # trigrams in more titles are too common to select candidates
+
+    def __init__(self, entries):
+        """
+        entries: iterable of (ppid, title)
+        """
+        folded = []
+        for ppid, title in entries:
+            grams = trigrams(fold_title(title))
+            if grams:
+                folded.append((len(grams), ppid, title, grams))
+        folded.sort(key=lambda entry: entry[0])
+        self.entries = [(ppid, title) for size, ppid, title, grams in folded]
+        self.grams = [grams for size, ppid, title, grams in folded]
+        self.sizes = [size for size, ppid, title, grams in folded]
+        self.postings = {}
+        for number, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(number)
+        self.max_posting = max(50, int(len(self.entries) * self.max_posting_share))
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def score(query_grams, title_grams):
+        common = len(query_grams & title_grams)
+        if not common:
+            return 0.0
+        dice = 2.0 * common / (len(query_grams) + len(title_grams))
+        coverage = float(common) / len(title_grams)
+        return 0.5 * dice + 0.5 * coverage
+
+    @staticmethod
+    def similarity(query, title):
+        """
+        Score of one title for a query (0.0 ... 1.0), for titles not in the index.
+        """
+        return TitleMatcher.score(trigrams(fold_title(query)), trigrams(fold_title(title)))
+
+    def search(self, query, limit=10, min_score=0.5):
+        """
+        Return the best matching titles as list of (ppid, score, title), best first.
+        """
+        query_grams = trigrams(fold_title(query))
+        if not query_grams:
+            return []
+        size = len(query_grams)
+        rare = [gram for gram in query_grams if len(self.postings.get(gram, ())) <= self.max_posting]
+        if not rare:
+            rare = query_grams
+        unknown = size - len(rare)  # common trigrams not counted
+        # A title of t trigrams, c of them common, scores at most c / (size + c) + 0.5 (all its trigrams in the
+        # query) and min(size, t) / (size + t) + min(size, t) / 2t. This bounds c and t, for 0.75: c >= size / 3,
+        # size / 3 <= t <= 1.46 * size.
+        first, last, needed = 0, len(self.entries), 0
+        if min_score > 0.5:
+            needed = (min_score - 0.5) * size / (1.5 - min_score) - 1e-9
+            first = bisect.bisect_left(self.sizes, needed)
+            # Largest t with size / (size + t) + size / 2t >= min_score (root of the quadratic equation)
+            b = (min_score - 1.5) * size
+            longest = (-b + (b * b + 2 * min_score * size * size) ** 0.5) / (2 * min_score)
+            last = bisect.bisect_right(self.sizes, longest + 1e-9)
+            needed = needed - unknown
+        counts = Counter(chain.from_iterable(
+            postings[bisect.bisect_left(postings, first):bisect.bisect_left(postings, last)]
+            for postings in (self.postings.get(gram, ()) for gram in rare)))
+        results = []
+        for number, count in [item for item in counts.items() if item[1] >= needed]:
+            grams = self.grams[number]
+            # Prune with the best possible score (all common trigrams of the query in the title)
+            common = min(count + unknown, len(grams))
+            if 0.5 * (2.0 * common / (len(query_grams) + len(grams))) + 0.5 * common / len(grams) < min_score:
+                continue
+            score = self.score(query_grams, grams)
+            if score >= min_score:
+                results.append((score, number))
+        results.sort(key=lambda result: (-result[0], self.entries[result[1]][1]))
+        return [(self.entries[number][0], score, self.entries[number][1]) for score, number in results[:limit]]
+
+
+class TitleIndex(object):
+    """
+    Local index of all ppid pages (redirects in namespace "Quelle:") and their target pages, stored in a SQLite
+    database in calibre's cache directory: ppid -> canonical title, url, series code, issue number, cover file.
+    The index is built by crawling the wiki with the API in the background. The continuation of the crawl is
+    stored, so an interrupted build is resumed.
+    """
+
+    def __init__(self, path, max_age):
+        self.path = path
+        self.max_age = max_age  # seconds
+        self.lock = threading.RLock()
+        self._conn = None
+
+    def _connection(self):
+        # This must only be called once we have the lock
+        if self._conn is None:
+            dirname = os.path.dirname(self.path)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('CREATE TABLE IF NOT EXISTS pages (ppid TEXT PRIMARY KEY, title TEXT, title_key TEXT, '
+                         'base_key TEXT, url TEXT, series_code TEXT, issuenumber INTEGER, cover_file TEXT, '
+                         'updated REAL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS pages_title_key ON pages (title_key)')
+            conn.execute('CREATE INDEX IF NOT EXISTS pages_base_key ON pages (base_key)')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self._connection().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set_meta(self, key, value):
+        with self.lock:
+            conn = self._connection()
+            if value is None:
+                conn.execute('DELETE FROM meta WHERE key = ?', (key,))
+            else:
+                conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+            conn.commit()
+
+    def is_complete(self):
+        """
+        True, if the index has been built completely and is not older than max_age.
+        """
+        completed = self.get_meta('completed')
+        return completed is not None and completed + self.max_age >= time.time()
+
+    def __len__(self):
+        with self.lock:
+            return self._connection().execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def add(self, entries):
+        """
+        Add or update entries (ppid, title, url, series_code, issuenumber, cover_file).
+        """
+        now = time.time()
+        with self.lock:
+            conn = self._connection()
+            conn.executemany('INSERT OR REPLACE INTO pages (ppid, title, title_key, base_key, url, series_code, '
+                             'issuenumber, cover_file, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                             [(ppid, title, title_key(title), title_key(re.sub(r'\s*\([^()]*\)$', '', title)), url,
+                               series_code, issuenumber, cover_file, now)
+                              for ppid, title, url, series_code, issuenumber, cover_file in entries])
+            conn.commit()
+
+    def remove_older(self, timestamp):
+        """
+        Remove the entries not seen by the last complete build (deleted pages).
+        """
+        with self.lock:
+            conn = self._connection()
+            conn.execute('DELETE FROM pages WHERE updated < ?', (timestamp,))
+            conn.commit()
+
+    def titles(self):
+        """
+        Return all (ppid, title) pairs.
+        """
+        with self.lock:
+            return self._connection().execute('SELECT ppid, title FROM pages').fetchall()
+
+    def _rows(self, where, args):
+        with self.lock:
+            rows = self._connection().execute(
+                'SELECT ppid, title, url, series_code, issuenumber, cover_file FROM pages WHERE ' + where + ' ORDER BY '
+                'ppid', args).fetchall()
+        return [dict(zip(('ppid', 'title', 'url', 'series_code', 'issuenumber', 'cover_file'), row)) for row in rows]
+
+    def lookup_ppid(self, ppid):
+        rows = self._rows('ppid = ?', (ppid,))
+        return rows[0] if rows else None
+
+    def lookup_issue(self, series_code, issuenumber):
+        rows = self._rows('series_code = ? AND issuenumber = ?', (series_code, issuenumber))
+        return rows[0] if rows else None
+
+    def find_title(self, title):
+        """
+        Return the entries whose title matches title exactly or without the book type in parentheses
+        ('Das Erbe der Yulocs' finds also 'Das Erbe der Yulocs (Silberband)').
+        """
+        key = title_key(title)
+        return self._rows('title_key = ? OR base_key = ?', (key, key))
+
+
+class SingleFlight(object):
+    """
+    Coalesce concurrent calls with the same key: the first caller runs the function, callers arriving while it
+    runs wait for its result (or its exception) instead of running the function again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}  # key: [event, result, exception]
+        self.calls = 0
+        self.shared = 0  # calls served by another caller's run (saved fetches)
+
+    def do(self, key, function):
+        with self.lock:
+            self.calls = self.calls + 1
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = [threading.Event(), None, None]
+                self.in_flight[key] = call
+            else:
+                self.shared = self.shared + 1
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1]
+        try:
+            call[1] = function()
+        except Exception as e:
+            call[2] = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call[0].set()
+        return call[1]
+
+
+class HttpError(Exception):
+    """
+    Http error status of a response from the HttpPool. Like the mechanize errors, it has getcode().
+    """
+
+    def __init__(self, url, code, reason):
+        Exception.__init__(self, 'HTTP Error {0}: {1} ({2})'.format(code, reason, url))
+        self.url = url
+        self.code = code
+        self.reason = reason
+
+    def getcode(self):
+        return self.code
+
+
+class HttpResponse(object):
+    """
+    A completely read response from the HttpPool, with the same read(), info(), geturl() and getcode() as a
+    mechanize response.
+    """
+
+    def __init__(self, url, code, headers, body):
+        self.url = url
+        self.code = code
+        self.headers = headers
+        self.body = body
+
+    def read(self):
+        return self.body
+
+    def info(self):
+        return self.headers
+
+    def geturl(self):
+        return self.url
+
+    def getcode(self):
+        return self.code
+
+
+class HttpPool(object):
+    """
+    Http client with one pool of keep-alive connections per host (perrypedia.de, isfdb.org, web.archive.org, ...).
+    Responses are requested compressed (gzip, deflate) and decompressed transparently, redirects are followed.
+    A connection is used by one thread at a time and goes back into the pool, after the response was read.
+    """
+
+    redirect_codes = (301, 302, 303, 307, 308)
+    max_redirects = 10
+
+    def __init__(self, ignore_ssl_errors=False, max_idle_per_host=8):
+        self.ignore_ssl_errors = ignore_ssl_errors
+        self.max_idle_per_host = max_idle_per_host
+        self.lock = threading.Lock()
+        self.idle = {}  # (scheme, host, port): [connection, ...]
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.bytes_received = 0  # compressed
+        self.bytes_decoded = 0
+        self.ssl_context = ssl.create_default_context()
+        if ignore_ssl_errors:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+
+    def _get_connection(self, key, timeout):
+        with self.lock:
+            connections = self.idle.get(key)
+            if connections:
+                self.connections_reused = self.connections_reused + 1
+                connection = connections.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+            self.connections_opened = self.connections_opened + 1
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _put_connection(self, key, connection):
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _request(self, url, headers, timeout):
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise ValueError('Unsupported url: {0}'.format(url))
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == 'https' else 80))
+        path = quote(parts.path or '/', safe="/%:()!,;'*@$&+=~-._")
+        if parts.query:
+            path = path + '?' + quote(parts.query, safe="/%:()!,;'*@$&+=~-._?|")
+        request_headers = {'Host': parts.netloc, 'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'}
+        request_headers.update(headers)
+        while True:
+            connection, reused = self._get_connection(key, timeout)
+            try:
+                connection.request('GET', path, headers=request_headers)
+                response = connection.getresponse()
+                raw = response.read()
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError):
+                connection.close()
+                if reused:
+                    # The server has closed the idle connection, try again with a new one
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._put_connection(key, connection)
+            return response, raw
+
+    def _decode(self, response, raw):
+        encoding = (response.getheader('Content-Encoding') or '').strip().lower()
+        if encoding in ('gzip', 'x-gzip'):
+            return zlib.decompress(raw, 16 + zlib.MAX_WBITS)
+        if encoding == 'deflate':
+            try:
+                return zlib.decompress(raw)
+            except zlib.error:
+                # Some servers send raw deflate data without zlib header
+                return zlib.decompress(raw, -zlib.MAX_WBITS)
+        return raw
+
+    def open(self, url, headers=None, timeout=30):
+        """
+        GET url and return a HttpResponse. Raise HttpError for a status code other than 2xx (e. g. 304 Not Modified).
+        """
+        headers = dict(headers or {})
+        for _redirect in range(self.max_redirects + 1):
+            response, raw = self._request(url, headers, timeout)
+            if response.status in self.redirect_codes and response.getheader('Location'):
+                url = urljoin(url, response.getheader('Location'))
+                continue
+            break
+        if not 200 <= response.status < 300:
+            raise HttpError(url, response.status, response.reason)
+        body = self._decode(response, raw)
+        with self.lock:
+            self.bytes_received = self.bytes_received + len(raw)
+            self.bytes_decoded = self.bytes_decoded + len(body)
+        info = Message()
+        for name, value in response.getheaders():
+            info[name] = value
+        return HttpResponse(url, response.status, info, body)
+
+
 # def camel_case_split_title(str):
 #     titles = []
 #     i = 1
@@ -230,6 +1260,47 @@ class Perrypedia(Source):
     # ToDo:
     # - Using feed, e. g. https://forum.perry-rhodan.net/feed?f=152?
     # - Statistik aus Exil-Forum
+    # Version 1.11.0
+    # - Persistent cache for downloaded pages (options for cache lifetime and size).
+    #   Forum pages and searches expire after hours, not after the cache lifetime.
+    # - Expired cache entries are revalidated with conditional requests (ETag / Last-Modified).
+    # - Title search downloads the candidate pages in parallel (option for the number of parallel downloads).
+    # - All cover file pages of a book are downloaded in parallel.
+    # - Cover urls are resolved in one MediaWiki API request (imageinfo), cover pages are parsed as fallback.
+    # - Cover download for PR issues without identify (cover file name from ppid).
+    # - All downloads use a pool of keep-alive connections per host with compressed transfer. The option
+    #   ignore_ssl_errors is now used for these connections.
+    # - Concurrent requests for the same page share one download (and one parsed page for the foreign cycles).
+    # - Book pages can be read from their wikitext (MediaWiki API), the html page is the fallback (option, off by
+    #   default until the overview is verified against captured pages).
+    # - The wikitext of consecutive issues is downloaded with one API request, when the issues are asked for in order
+    #   (option for the number of issues).
+    # - Local title index of all ppids (namespace "Quelle:"), built in the background. Used for title search,
+    #   titles of issue numbers and ppids (a ppid in the index goes straight to its book page, other ppids are looked
+    #   up online), option for the lifetime of the index.
+    # - Fuzzy title matching (trigrams) over all titles of the index. Candidates of a title search are ranked by
+    #   their similarity with the search text instead of alphabetical order.
+    # - Series and subseries patterns are compiled once and only tried, if their keywords occur in the text.
+    # - Series patterns without unbounded wildcards, so matching stays linear in the length of the title. Audit
+    #   of the worst-case matching time per pattern in the tests.
+    # - Cycle of an issue and first issue of a cycle from a sorted index of subseries_offsets. The cycle is set
+    #   from the index for {cycle} in the title template and the tags, if the book page has none.
+    # - Series codes from the series name by an index (exact name, else the longest contained name) instead of a
+    #   scan over all names. "Mission SOL" no longer shadows "Mission SOL 2".
+    # - Perrypedia pages are parsed with lxml (html.parser, if not available), and only the parts the plugin reads
+    #   (book pages, cover file pages, tables of foreign issues).
+    # - The plot of a book page ends at the next section, the rest of the page is not read.
+    # - Option for additional book page sections in the comments, downloaded one by one (MediaWiki API).
+    # - Results of a title search are put in the result queue one by one, as soon as the page is downloaded.
+    # - A title search stops after an exact match of title (and author), option to get all candidates anyway.
+    # - Hits of a title search that are no book pages (by categories and redirects from the API) are
+    #   not downloaded.
+    # - Disambiguation pages are resolved with one API request (links and their categories), nested disambiguation
+    #   pages are pruned.
+    # - The canonical book page of a ppid is remembered, once the "Quelle:" redirect was followed. Book page
+    #   downloads, the book url and the link in the comments use it directly.
+    # - Negative cache: unknown PPIDs and searches without hits (Perrypedia, ISFDB) are not repeated within the
+    #   lifetime set in the new option negative_cache_hours (default 24 hours).
     # Version 1.10.2 - 11-26-2025
     # - Fix for template replacement if no series code is given.
     # Version 1.10.1 - 11-24-2025
@@ -338,6 +1409,14 @@ class Perrypedia(Source):
     # See https://www.mobileread.com/forums/showthread.php?p=4425328
     order_number = 0
 
+    # Lifetime (hours) of cached pages that change more often than the book pages, first match wins. Pages not listed
+    # (Perrypedia book pages, ISFDB title pages, the archived kreis-archiv snapshot) use the cache lifetime option.
+    response_lifetimes = [
+        (re.compile(r'//forum\.perry-rhodan\.net/'), 6),  # forum threads, ratings and spoiler
+        (re.compile(r'[?&]search='), 6),  # title search (opensearch) and full text search
+        (re.compile(r'//(?:www\.)?isfdb\.org/cgi-bin/(?:se|adv_search_results)\.cgi'), 24),  # ISFDB search
+    ]
+
     # from class 'option' in base.py:
     '''
     :param name: The name of this option. Must be a valid python identifier
@@ -478,6 +1557,82 @@ class Perrypedia(Source):
               '(as translator and cover artist) about foreign issues in comment.'),
             COUNTRIES
         ),
+        # Local cache for Perrypedia pages (and other downloaded pages)
+        Option(
+            'cache_ttl_days',
+            'number',
+            30,
+            _('Cache lifetime (days)'),
+            _('Number of days a downloaded page is reused from the local cache before it is downloaded again. '
+              'Set to 0 to disable the cache.'),
+        ),
+        Option(
+            'cache_max_size_mb',
+            'number',
+            100,
+            _('Cache size (MB)'),
+            _('Maximum size of the local page cache. If the cache is full, the least recently used pages are removed.'),
+        ),
+        Option(
+            'negative_cache_hours',
+            'number',
+            24,
+            _('Cache lifetime of failed lookups (hours)'),
+            _('Number of hours an unknown PPID or a search without hits (Perrypedia, ISFDB) is not looked up again. '
+              'Set to 0 to look up every time.'),
+        ),
+        Option(
+            'max_concurrent_requests',
+            'number',
+            4,
+            _('Parallel downloads'),
+            _('Maximum number of pages downloaded at the same time, e. g. the candidate pages of a title search. '
+              'Set to 1 to download one page after the other.'),
+        ),
+        Option(
+            'use_wikitext',
+            'bool',
+            False,
+            _('Read book pages as wikitext (experimental)'),
+            _('Read the overview, plot and covers of a book page from its wikitext (MediaWiki API), which is much '
+              'smaller than the rendered page. Pages that can not be read this way are downloaded as html. '
+              'Experimental: the overview may differ from the rendered page.'),
+        ),
+        Option(
+            'prefetch_issues',
+            'number',
+            20,
+            _('Issues per request'),
+            _('When the wikitext of consecutive issues is downloaded (e. g. issue 1433 after 1432), the following '
+              'issues of the series are downloaded in the same request (maximum 50), so a bulk download of a series '
+              'needs only a few requests. '
+              'Set to 1 to download one issue per request.'),
+        ),
+        Option(
+            'title_index_days',
+            'number',
+            30,
+            _('Title index lifetime (days)'),
+            _('The plugin keeps a local index of all ppids and their book titles, built in the background with a '
+              'few hundred API requests. The index is rebuilt after this number of days. Set to 0 to disable it.'),
+        ),
+        Option(
+            'return_all_candidates',
+            'bool',
+            False,
+            _('Return all candidates of a title search'),
+            _('If a title search finds a book page with exactly the searched title (and author, if given), the other '
+              'candidates are not downloaded. Check this to get all candidates anyway.'),
+        ),
+        Option(
+            'extra_sections',
+            'string',
+            '',
+            _('Additional book page sections'),
+            _('Comma separated headings of book page sections that are added to the comments, e. g. '
+              '"Anmerkungen, Titelbild". Each section is downloaded with an own (small) request. The plot '
+              '("Handlung") is always included.'),
+        ),
     )
 
     # There are six log levels in Python; each level is associated with an integer that indicates the log severity.
@@ -554,12 +1709,12 @@ class Perrypedia(Source):
         'PRSB': r'(perry.{0,3}rhodan.{0,3}sonderbände)[^0-9]{1,5}(\d{1,2})'
                 r'|(perry.{0,3}rhodan.{0,3}sb)[^0-9]{1,5}(\d{1,2})'
                 r'|(perry.{0,3}rhodan.{0,3}sonderband)[^0-9]{1,5}(\d{1,2})|(pr.{0,3}sb)[^0-9]{1,5}(\d{1,2})',
-        'PRSTO': r'pr-storys – (.*) band (\d{1,2}): .*',  # PR-Storys – Galacto City Band 6: Anschlag auf Galacto City
-        'PRTB': r'(perry.*rhodan.*planetenromane) (\d{4}).*'  # [Perry Rhodan - Planetenromane 0093] • Das Tor zur Überwelt
+        'PRSTO': r'pr-storys – (.{1,60}) band (\d{1,2}): .*',  # PR-Storys – Galacto City Band 6: Anschlag auf Galacto City
+        'PRTB': r'(perry.{0,40}rhodan.{0,40}planetenromane) (\d{4})'  # [Perry Rhodan - Planetenromane 0093] • Das Tor zur Überwelt
                 r'|(planetenroman)[^0-9]{1,5}(\d{1,3})|(pr.{1,5}tb)[^0-9]{1,5}(\d{1,3})'
                 r'|(perry rhodan taschenbuch)[^0-9]{1,5}(\d{1,3})'
                 r'|(perry.{0,3}rhodan.{0,3}tasch.{0,3}buch.{0,3}nr)[^0-9]{0,3}(\d{1,3})'
-                r'|(perry.*rhodan.*tb)[^0-9]{1,5}(\d{1,3})'
+                r'|(perry.{0,40}rhodan.{0,40}tb)[^0-9]{1,5}(\d{1,3})'
                 r'|(perry rhodan planeten roman)[^0-9]{1,5}(\d{1,3})'
                 r'|(planetenroman)[^0-9]{1,5}(\d{1,3})|(pr.tb)[^0-9]{1,5}(\d{1,3})',
         'PRTBA': r'(perry.{1,3}rhodan.{1,5}andromeda)[^0-9]{1,5}(\d{1,2})'
@@ -592,8 +1747,8 @@ class Perrypedia(Source):
               r'|(\d{1,4})[^0-9]{0,3}(perry.{0,3}rhodan)|(\d{1,4})[^0-9]{0,3}(pr)'
               r'|(perry.{0,3}rhodan)[^0-9]{0,5}(\d{1,})|(perry rhodan)[^0-9]{0,5}(\d{1,})'
               r'|(pr)[^0-9]{0,5}(\d{1,})|(pr) (\d{1,})|(perry-rhodan)-(\d{4,4})'
-              r'|.* leseprobe (pr) .*band (\d{4,4}) .*'  # 12024017 leseprobe pr yband 3300 web 0
-              r'|.* leseprobe (Band) (\d{4,4}) .*',  # 12025013 Leseprobe Band 3350 web RZ
+              r'| leseprobe (pr) .{0,40}band (\d{4,4}) '  # 12024017 leseprobe pr yband 3300 web 0
+              r'| leseprobe (Band) (\d{4,4}) ',  # 12025013 Leseprobe Band 3350 web RZ
     }
 
     # Zyklen
@@ -681,6 +1836,12 @@ class Perrypedia(Source):
         ['Rudyn', 'ATB', 4, r'(rudyn) (\d{1,})|(lordrichter)[^0-9]{1,3}(\d{1,})'],
     ]
 
+    # The patterns of series_regex and subseries_offsets, compiled once, with the same priority (first match wins)
+    series_matcher = SeriesMatcher(series_regex.items())
+    subseries_matcher = SeriesMatcher((number, subserie[3]) for number, subserie in enumerate(subseries_offsets))
+    # Cycle of an issue and first issue of a cycle, per series
+    cycle_index = CycleIndex(subseries_offsets)
+
     # see https://www.perrypedia.de/wiki/Produkte
     # https://www.perrypedia.de/wiki/Hilfe:Quellenangaben
     series_names = {
@@ -783,6 +1944,9 @@ class Perrypedia(Source):
         'STEBP': 'Stellaris E-Book Pakete',  # https://www.perrypedia.de/wiki/Stellaris_E-Book_Pakete
         'Stellaris': 'Stellaris',  # https://www.perrypedia.de/wiki/Stellaris_(Serie)
     }
+
+    # Series code of a series name, e. g. of the 'Serie:' row of a book page
+    series_name_index = SeriesNameIndex(series_names)
     # https://www.perrypedia.de/wiki/Perry_Rhodan-Gold-Edition
     # https://www.perrypedia.de/wiki/Titelbildgalerie_Gold-Edition_1_-_99_(in_der_Reihenfolge_der_Heftnummern)
 
@@ -814,11 +1978,38 @@ class Perrypedia(Source):
         'Werkstattband': '/wiki/',
     }
 
+    # File names of the original covers for series with a fixed naming pattern. For these series a cover can be
+    # downloaded from the ppid alone (Spezial:Dateipfad redirects to the image), without parsing the book page.
+    # https://www.perrypedia.de/wiki/Spezial:Dateipfad/PR2038.jpg
+    # -> https://www.perrypedia.de/mediawiki/images/d/d1/PR2038.jpg
+    # Other series have no fixed pattern (A500_1.JPG etc.), the cover url is taken from the book page.
+    series_cover_file_names = {
+        'PR': 'PR{0:04d}.jpg',
+    }
+
+    # Minimum score of the fuzzy title matcher for a candidate of the title search (0.0 ... 1.0)
+    fuzzy_title_min_score = 0.75
+
+    # Maximum number of prefetched wikitexts kept in memory until their issue is asked for (least recently fetched
+    # are dropped first)
+    max_prefetched_wikitexts = 200
+
+    # Parameters of the overview template, whose names differ from the row labels of the rendered overview table.
+    # All other parameters are taken with their name as label ('titel' -> 'Titel:').
+    overview_template_parameters = {
+        'autoren': 'Autor',
+        'erscheinungsdatum': 'Erstmals erschienen',
+    }
+
     # Strings we found in page titles (in parentheses). Void = Other book source (in most cases PR series),
     # if '(Roman)' not present.
     book_variants = ['Blauband', 'Buch', 'Comic', 'Heftroman', 'Hörbuch', 'Leihbuch', 'Leihbücher', 'Planetenroman',
                      'PR Neo', 'Perry Rhodan-Heftromane', 'Roman', 'Taschenheft', 'Silberband']
 
+    # Main words of the categories of book pages (to skip other hits of a title search), see is_book_category()
+    book_page_keywords = ['roman', 'buch', 'bücher', 'heft', 'hörspiel', 'silberband', 'silberbände', 'blauband',
+                          'blaubände', 'comic', 'taschenheft']
+
     # (Begriffsklärung)
 
 
@@ -936,7 +2127,15 @@ class Perrypedia(Source):
         # https://www.perrypedia.de/wiki/Quelle:PRMS2_1
         # If we have a PP id then we do not need to fire a "search" at Perrypedia.
         # Instead we will go straight to the (redirect) URL for that book.
-        if pp_id:
+        # A ppid in the title index goes straight to the indexed book page. A ppid missing from the index may be newer
+        # than the index and is looked up online, unknown ppids are kept in the negative cache.
+        raw_metadata = self.get_raw_metadata_from_index(pp_id, self.browser, 20, log, loglevel) if pp_id else None
+        if raw_metadata is not None:
+            if loglevel == self.loglevels['DEBUG']:
+                log.info('raw_metadata={0}'.format(raw_metadata))
+            mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel, ppid=pp_id)
+            result_queue.put(mi)  # Send the metadata found to calibre
+        elif pp_id:
             # Is there a underscore (to distinguish a series codes that endet with a digit from issue number) in ppid?
             # https://www.perrypedia.de/wiki/Quelle:PRMS2_1
             if pp_id.find('_') != -1:
@@ -955,7 +2154,7 @@ class Perrypedia(Source):
                                                                                      self.browser, 20, log, loglevel)
                     if loglevel == self.loglevels['DEBUG']:
                         log.info('raw_metadata={0}'.format(raw_metadata))
-                    mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel)
+                    mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel, ppid=pp_id)
                     result_queue.put(mi)  # Send the metadata found to calibre
                 else:
                     log.error(_('Unexpected structure of field pp_id:'), pp_id)
@@ -979,7 +2178,7 @@ class Perrypedia(Source):
                                                                                      self.browser, 20, log, loglevel)
                     if loglevel == self.loglevels['DEBUG']:
                         log.info('raw_metadata={0}'.format(raw_metadata))
-                    mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel)
+                    mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel, ppid=pp_id)
                     result_queue.put(mi)  # Send the metadata found to calibre
                 else:
                     # Prüfen: https://www.perrypedia.de/wiki/Weltraumatlas
@@ -992,7 +2191,7 @@ class Perrypedia(Source):
                                                                                          loglevel)
                         if loglevel == self.loglevels['DEBUG']:
                             log.info('raw_metadata={0}'.format(raw_metadata))
-                        mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel)
+                        mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel, ppid=pp_id)
                         result_queue.put(mi)  # Send the metadata found to calibre
                     else:
                         log.exception(
@@ -1032,7 +2231,7 @@ class Perrypedia(Source):
                     log.info('raw_metadata={0}'.format(raw_metadata))
                 if raw_metadata:
                     # Parse metadata source and put metadata in result queue
-                    mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel)
+                    mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel, ppid=pp_id)
                     if series_code == 'PRTH':
                         mi.comments = mi.comments + \
                                       _('Version hint: This is publication {0} in Taschenheft series.').format(
@@ -1081,7 +2280,7 @@ class Perrypedia(Source):
                                                                                              loglevel)
                             if loglevel == self.loglevels['DEBUG']:
                                 log.info('raw_metadata={0}'.format(raw_metadata))
-                            mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel)
+                            mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel, ppid=pp_id)
                             result_queue.put(mi)  # Send the metadata found to calibre
                         else:
                             log.error(_('Unexpected structure of field pp_id:'), pp_id)
@@ -1107,7 +2306,7 @@ class Perrypedia(Source):
                                                                                              loglevel)
                             if loglevel == self.loglevels['DEBUG']:
                                 log.info('raw_metadata={0}'.format(raw_metadata))
-                            mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel)
+                            mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel, ppid=pp_id)
                             result_queue.put(mi)  # Send the metadata found to calibre
                 except Exception as e:
                     exc_type, exc_obj, exc_tb = sys.exc_info()
@@ -1116,21 +2315,17 @@ class Perrypedia(Source):
                     log.info('exc_type={0}, exc_tb.tb_lineno={1}').format(exc_type, exc_tb.tb_lineno)
             else:
                 # possible ambiguous title - more than one metadata soup possible
-                result = self.get_raw_metadata_from_title(title, authors_str, self.browser, 20, log, loglevel)
-                # {
-                # 'Das Erbe der Yulocs': ['PR630', 'https://www.perrypedia.de/wiki/Quelle:PR630'],
-                # 'Das Erbe der Yulocs (Hörbuch)': ['SE71', 'https://www.perrypedia.de/wiki/Quelle:SE71'],
-                # 'Das Erbe der Yulocs (Silberband)': ['PRHC71', 'https://www.perrypedia.de/wiki/Quelle:PRHC71']
-                # }
-                books = result[0].items()  # items() returns a list of tuples (key, values)
-                if loglevel in [self.loglevels['DEBUG']]:
-                    log.info('books={0}'.format(books))
-                soups = result[1]
-                for book, soup in zip(books, soups):
+                # Every book page found is parsed and put in the result queue as soon as it is downloaded (with its
+                # rank 0, 1, 2, ...):
+                # ('Das Erbe der Yulocs', ['PR630', 'https://www.perrypedia.de/wiki/Quelle:PR630'], soup),
+                # ('Das Erbe der Yulocs (Hörbuch)', ['SE71', 'https://www.perrypedia.de/wiki/Quelle:SE71'], soup),
+                # ('Das Erbe der Yulocs (Silberband)', ['PRHC71', 'https://www.perrypedia.de/wiki/Quelle:PRHC71'], soup)
+                for book_key, book_values, soup, rank in self.get_raw_metadata_from_title(
+                        title, authors_str, self.browser, 20, log, loglevel, abort=abort):
                     if loglevel in [self.loglevels['DEBUG']]:
-                        log.info('book={0}'.format(book))
-                    url = book[1][1]
-                    title = soup.title.string
+                        log.info('book={0}'.format((book_key, book_values)))
+                    url = book_values[1]
+                    title = page_heading(soup)
                     if loglevel in [self.loglevels['DEBUG']]:
                         log.info(''.join([char * 20 for char in '-']))
                         log.info(_('Next soup, page title:'), title)
@@ -1143,7 +2338,10 @@ class Perrypedia(Source):
                         continue
                     if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
                         log.info(_('Result found with title search.'))
-                    mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel)
+                    mi = self.parse_raw_metadata(raw_metadata, self.series_names, log, loglevel,
+                                                 ppid=book_values[0] or None)
+                    # Sort by the similarity with the searched title, not by the download order
+                    mi.source_relevance = rank
                     result_queue.put(mi)
                     # ['Serie:', 'Perry Rhodan-Heftserie (Band 1433)', '© Pabel-Moewig Verlag KG']
                     series_code = None
@@ -1155,7 +2353,7 @@ class Perrypedia(Source):
                         overview = dict(raw_metadata[0])
                         if loglevel == self.loglevels['DEBUG']:
                             log.info("overview=", overview)
-                        series_code = get_key(self.series_names, overview['Serie:'], exact=False)
+                        series_code = self.series_name_index.find(overview['Serie:'])
                         issuenumber = int(str(re.search(r'\d+', overview['Serie:']).group()).strip())
                         if loglevel == self.loglevels['DEBUG']:
                             log.info("series_code=", series_code)
@@ -1175,6 +2373,8 @@ class Perrypedia(Source):
             abort = True
             return []
         else:
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                self.log_download_stats(log)
             return result_queue
 
     def download_cover(self, log, result_queue, abort, title=None, authors=None, identifiers={}, timeout=30,
@@ -1221,6 +2421,26 @@ class Perrypedia(Source):
 
         # cover_url = 'https://www.perrypedia.de/mediawiki/images/a/a9/PR0777.jpg'
 
+        if cover_urls is None:
+            # Fast path: series with a fixed cover file name pattern need only one request
+            cover_url = self.get_cover_url_from_file_name(identifiers.get('ppid', None))
+            if cover_url is not None:
+                try:
+                    if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                        log.info(_('Going to download cover from url'), cover_url)
+                    cdata = self.open_url(self.browser, cover_url, timeout).read()
+                    if cdata:
+                        result_queue.put((self, cdata))
+                        self.cache_identifier_to_cover_url('ppid:' + identifiers['ppid'], [cover_url])
+                        if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                            log.info(_('Have downloaded cover from'), cover_url)
+                        return
+                except Exception:
+                    if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                        log.info(_('No cover found with file name, running identify.'))
+            if abort.is_set():
+                return
+
         if cover_urls is None:
             if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
                 log.info(_('No cached cover found, running identify.'))
@@ -1268,7 +2488,7 @@ class Perrypedia(Source):
             try:
                 if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
                     log.info(_('Going to download cover from url'), cover_url)
-                cdata = self.browser.open_novisit(cover_url, timeout=timeout).read()
+                cdata = self.open_url(self.browser, cover_url, timeout).read()
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('cdata=', str(cdata)[:80])
                 result_queue.put((self, cdata))
@@ -1277,10 +2497,23 @@ class Perrypedia(Source):
             except Exception:
                 log.exception(_('Failed to download cover from'), cover_url)
 
+    def get_cover_url_from_file_name(self, pp_id):
+        """
+        Return the url of the original cover for a ppid if the series has a fixed cover file name pattern,
+        else None. The url is not validated.
+        """
+        if not pp_id:
+            return None
+        match = re.match(r'^([A-Za-z]+)(\d+)$', pp_id.strip())
+        if match is None or match.group(1) not in self.series_cover_file_names:
+            return None
+        file_name = self.series_cover_file_names[match.group(1)].format(int(match.group(2)))
+        return self.base_url + '/wiki/Spezial:Dateipfad/' + file_name
+
     def get_book_url(self, identifiers):
         pp_id = identifiers.get('ppid', None)
         if pp_id:
-            url = 'https://www.perrypedia.de/wiki/Quelle:' + pp_id
+            url = self.canonical_url(pp_id) or 'https://www.perrypedia.de/wiki/Quelle:' + pp_id
             return ('ppid', pp_id, url)
 
     def create_query(self, log, title=None, authors=None, identifiers={}):
@@ -1303,16 +2536,350 @@ class Perrypedia(Source):
 
     def get_details(self, browser, url, timeout):  # {{{
         try:
-            raw = browser.open_novisit(url, timeout=timeout).read()
+            raw = self.fetch_url(browser, url, timeout)
         except Exception as e:
             gc = getattr(e, 'getcode', lambda: -1)
             if gc() != 403:
                 raise
             # wait a little
             time.sleep(2)
-            raw = browser.open_novisit(url, timeout=timeout).read()
+            raw = self.fetch_url(browser, url, timeout)
         return raw
 
+    def response_cache(self):
+        """
+        Return the persistent response cache or None, if the cache is disabled in the plugin options.
+        """
+        ttl_days = self.prefs['cache_ttl_days']
+        if not ttl_days or ttl_days <= 0:
+            return None
+        with self.cache_lock:
+            cache = getattr(self, '_response_cache', None)
+            if cache is None:
+                path = os.path.join(cache_dir(), 'perrypedia', 'responses.sqlite')
+                cache = ResponseCache(path, self.prefs['cache_max_size_mb'] * 1024 * 1024, ttl_days * 24 * 60 * 60)
+                self._response_cache = cache
+            return cache
+
+    def response_ttl(self, url):
+        """
+        Return the cache lifetime in seconds for url: short for forum pages and searches, the cache lifetime option
+        for everything else.
+        """
+        ttl = self.prefs['cache_ttl_days'] * 24 * 60 * 60
+        for pattern, hours in self.response_lifetimes:
+            if pattern.search(url):
+                return min(ttl, hours * 60 * 60)
+        return ttl
+
+    def known_failure(self, kind, key, log=None, loglevel=None):
+        """
+        Return True, if the lookup of kind ('page', 'opensearch', 'isfdb') for key failed within the last
+        negative_cache_hours.
+        """
+        cache = self.response_cache()
+        if cache is None or not self.prefs['negative_cache_hours'] or self.prefs['negative_cache_hours'] <= 0:
+            return False
+        try:
+            failed = cache.is_failure(kind, key)
+        except sqlite3.Error:
+            return False
+        if failed and log is not None and loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+            log.info(_('Lookup failed before, not repeated: {0} {1}').format(kind, key))
+        return failed
+
+    def remember_failure(self, kind, key, log, url=None):
+        cache = self.response_cache()
+        hours = self.prefs['negative_cache_hours']
+        if cache is None or not hours or hours <= 0:
+            return
+        try:
+            cache.put_failure(kind, key, hours * 60 * 60, url)
+        except sqlite3.Error as e:
+            log.error(_('Response cache not writable: {0}').format(e))
+
+    def canonical_url(self, ppid):
+        """
+        The url of the book page of a ppid without the redirect from "Quelle:", if the redirect was followed before,
+        otherwise None.
+        """
+        cache = self.response_cache()
+        try:
+            title = cache.get_redirect(ppid) if cache is not None and ppid else None
+        except sqlite3.Error:
+            title = None
+        if title is None:
+            return None
+        return self.base_url + '/wiki/' + quote(title.replace(' ', '_'), safe="/:(),!'")
+
+    def book_page_url(self, ppid):
+        """
+        The url of the book page of a ppid: the canonical page, if known, otherwise the "Quelle:" redirect.
+        """
+        return self.canonical_url(ppid) or self.base_url + '/wiki/Quelle:' + quote(ppid)
+
+    def remember_redirect(self, page_title, title, log):
+        """
+        Store the target of a followed "Quelle:" redirect (page_title: Quelle:PR1433, title: Brigade der Sternenlotsen).
+        """
+        if not page_title.startswith('Quelle:') or not title or title == page_title:
+            return
+        cache = self.response_cache()
+        try:
+            if cache is not None and cache.get_redirect(page_title[7:]) != title:
+                cache.put_redirect(page_title[7:], title)
+        except sqlite3.Error as e:
+            log.error(_('Response cache not writable: {0}').format(e))
+
+    def forget_redirect(self, ppid, log):
+        cache = self.response_cache()
+        try:
+            if cache is not None:
+                cache.remove_redirect(ppid)
+        except sqlite3.Error as e:
+            log.error(_('Response cache not writable: {0}').format(e))
+
+    def http_pool(self):
+        """
+        Return the shared HttpPool (keep-alive connections, compressed transfer) for all downloads.
+        """
+        ignore_ssl_errors = bool(self.prefs['ignore_ssl_errors'])
+        with self.cache_lock:
+            pool = getattr(self, '_http_pool', None)
+            if pool is None or pool.ignore_ssl_errors != ignore_ssl_errors:
+                if pool is not None:
+                    pool.close()
+                pool = HttpPool(ignore_ssl_errors=ignore_ssl_errors)
+                self._http_pool = pool
+            return pool
+
+    def open_url(self, browser, url, timeout, headers=None):
+        """
+        Open url with the shared HttpPool and return the response (read(), info(), geturl()).
+        The headers of the browser (User-Agent) are sent with the request. If a proxy is configured for the host,
+        the request goes through the mechanize browser, which knows the proxy settings.
+        """
+        parts = urlsplit(url)
+        if parts.scheme in getproxies() and not proxy_bypass(parts.hostname or ''):
+            if headers:
+                return browser.open_novisit(mechanize.Request(url, headers=headers), timeout=timeout)
+            return browser.open_novisit(url, timeout=timeout)
+        request_headers = dict(getattr(browser, 'addheaders', None) or [])
+        request_headers.update(headers or {})
+        return self.http_pool().open(url, headers=request_headers, timeout=timeout)
+
+    def title_index(self, log=None):
+        """
+        Return the local title index or None, if it is disabled in the plugin options. If the index is not
+        complete or outdated, it is (re)built in a background thread. Until then, lookups may miss.
+        """
+        days = self.prefs['title_index_days']
+        if not days or days <= 0:
+            return None
+        with self.cache_lock:
+            index = getattr(self, '_title_index', None)
+            if index is None:
+                path = os.path.join(cache_dir(), 'perrypedia', 'index.sqlite')
+                index = TitleIndex(path, days * 24 * 60 * 60)
+                self._title_index = index
+            try:
+                complete = index.is_complete()
+                error = index.get_meta('error')
+            except sqlite3.Error as e:
+                if log is not None:
+                    log.error(_('Title index not readable: {0}').format(e))
+                return None
+            thread = getattr(self, '_title_index_thread', None)
+            if not complete and (thread is None or not thread.is_alive()):
+                if error is not None and log is not None:
+                    log.error(_('Building the title index failed: {0}').format(error))
+                thread = threading.Thread(target=self.build_title_index, args=(index, log),
+                                          name='Perrypedia title index')
+                thread.daemon = True
+                self._title_index_thread = thread
+                thread.start()
+        return index
+
+    def title_matcher(self, log=None):
+        """
+        Return the fuzzy matcher over all titles of the title index or None, if the index is disabled or empty.
+        The matcher is rebuilt, when the index has been updated.
+        """
+        index = self.title_index(log)
+        if index is None:
+            return None
+        try:
+            completed = index.get_meta('completed')
+            with self.cache_lock:
+                matcher = getattr(self, '_title_matcher', None)
+                if matcher is None or self._title_matcher_completed != completed:
+                    matcher = TitleMatcher(index.titles())
+                    self._title_matcher = matcher
+                    self._title_matcher_completed = completed
+        except sqlite3.Error as e:
+            if log is not None:
+                log.error(_('Title index not readable: {0}').format(e))
+            return None
+        return matcher if len(matcher) else None
+
+    def build_title_index(self, index, log=None, timeout=30):
+        """
+        Crawl all redirects in namespace "Quelle:" with their targets (generator=allpages with redirects resolved)
+        and store them in the title index. The API continuation is saved after every batch.
+        """
+        # https://www.perrypedia.de/mediawiki/api.php?action=query&generator=allpages&gapnamespace=102
+        # &gapfilterredir=redirects&gaplimit=500&redirects=1&format=json&formatversion=2
+        # {"continue": {"gapcontinue": "PR1000", "continue": "gapcontinue||"},
+        #  "query": {"redirects": [{"from": "Quelle:PR1", "to": "Unternehmen Stardust"}, ...], "pages": [...]}}
+        try:
+            namespace = index.get_meta('namespace')
+            if namespace is None:
+                url = self.api_url + urlencode({'action': 'query', 'meta': 'siteinfo', 'siprop': 'namespaces',
+                                                'format': 'json', 'formatversion': 2})
+                response = json.loads(self.fetch_url(self.browser, url, timeout, use_cache=False).strip())
+                namespace = next(ns['id'] for ns in response['query']['namespaces'].values()
+                                 if ns.get('name') == 'Quelle' or ns.get('canonical') == 'Quelle')
+                index.set_meta('namespace', namespace)
+            started = index.get_meta('started')
+            continuation = index.get_meta('continue')
+            if started is None or continuation is None:
+                started = time.time()
+                continuation = {}
+                index.set_meta('started', started)
+            while True:
+                params = {'action': 'query', 'generator': 'allpages', 'gapnamespace': namespace,
+                          'gapfilterredir': 'redirects', 'gaplimit': 500, 'redirects': 1, 'format': 'json',
+                          'formatversion': 2}
+                params.update(continuation)
+                url = self.api_url + urlencode(params)
+                response = json.loads(self.fetch_url(self.browser, url, timeout, use_cache=False).strip())
+                entries = []
+                for redirect in response.get('query', {}).get('redirects', []):
+                    ppid = redirect['from'].split(':', 1)[-1]
+                    title = redirect['to']
+                    match = re.match(r'^(.*?)_?(\d+)$', ppid)
+                    series_code = match.group(1) if match else ppid
+                    issuenumber = int(match.group(2)) if match else None
+                    cover_file = None
+                    if issuenumber is not None and series_code in self.series_cover_file_names:
+                        cover_file = self.series_cover_file_names[series_code].format(issuenumber)
+                    url = self.base_url + '/wiki/' + quote(title.replace(' ', '_'), safe="/:(),!'")
+                    entries.append((ppid, title, url, series_code, issuenumber, cover_file))
+                index.add(entries)
+                continuation = response.get('continue')
+                if not continuation:
+                    break
+                index.set_meta('continue', continuation)
+            index.remove_older(started)
+            index.set_meta('completed', time.time())
+            index.set_meta('continue', None)
+            index.set_meta('started', None)
+            index.set_meta('error', None)
+        except Exception as e:
+            # Try again with the next identify, the continuation is kept. The error is logged again at the next try,
+            # the log of this identify may be closed already.
+            if log is not None:
+                log.error(_('Building the title index failed: {0}').format(e))
+            try:
+                index.set_meta('error', str(e))
+            except sqlite3.Error:
+                pass
+
+    def log_download_stats(self, log):
+        cache = getattr(self, '_response_cache', None)
+        if cache is not None:
+            log.info(_('Response cache: {0} hits, {1} misses, {2} bytes saved by revalidation.').format(
+                cache.hits, cache.misses, cache.bytes_saved))
+        pool = getattr(self, '_http_pool', None)
+        if pool is not None:
+            log.info(_('Connections: {0} opened, {1} reused. {2} bytes received for {3} bytes of content.').format(
+                pool.connections_opened, pool.connections_reused, pool.bytes_received, pool.bytes_decoded))
+        flight = getattr(self, '_single_flight', None)
+        if flight is not None:
+            log.info(_('Requests: {0}, {1} fetches saved by concurrent requests for the same page.').format(
+                flight.calls, flight.shared))
+
+    def single_flight(self):
+        with self.cache_lock:
+            flight = getattr(self, '_single_flight', None)
+            if flight is None:
+                flight = SingleFlight()
+                self._single_flight = flight
+            return flight
+
+    def fetch_url(self, browser, url, timeout, log=None, loglevel=None, use_cache=True):
+        """
+        Download url and return the response body. Pages are served from the persistent response cache, if possible.
+        Expired cache entries are revalidated with a conditional request (If-None-Match / If-Modified-Since), so an
+        unchanged page costs only the response headers.
+        Concurrent requests for the same url (identify threads for many books) share one download.
+        Every page download in this plugin goes through this method.
+        """
+        flight = self.single_flight()
+        shared = flight.shared
+        body = flight.do(('fetch', normalize_url(url), use_cache),
+                         lambda: self._fetch_url(browser, url, timeout, log, loglevel, use_cache))
+        if log is not None and loglevel in [self.loglevels['DEBUG']] and flight.shared > shared:
+            log.info('Page shared with a concurrent request ({0} fetches saved): {1}'.format(flight.shared, url))
+        return body
+
+    def fetch_soup(self, browser, url, timeout, log=None, loglevel=None, parts=None):
+        """
+        Download url and return the parsed page (only the given PAGE_PARTS, if any). Concurrent requests for the same
+        url share one download and one parsed soup, so the soup must not be modified by the caller.
+        """
+        def parse():
+            page = self.fetch_url(browser, url, timeout, log, loglevel).strip()
+            if not page:
+                return None
+            return parse_html(page, parts)
+        return self.single_flight().do(('soup', parts, normalize_url(url)), parse)
+
+    def _fetch_url(self, browser, url, timeout, log=None, loglevel=None, use_cache=True):
+        cache = self.response_cache() if use_cache else None
+        ttl = self.response_ttl(url) if cache is not None else None
+        entry = None
+        if cache is not None:
+            try:
+                entry = cache.get_entry(url)
+            except sqlite3.Error as e:
+                if log is not None:
+                    log.error(_('Response cache not readable: {0}').format(e))
+                cache = None
+        # Entries stored before the lifetime of their kind was shortened expire by the new lifetime as well
+        if entry is not None and min(entry[1], (entry[4] or 0) + ttl) >= time.time():
+            body = cache.get(url)  # counts the hit and marks the entry as recently used
+            if body is not None:
+                if log is not None and loglevel in [self.loglevels['DEBUG']]:
+                    log.info('Page from cache: {0}'.format(url))
+                return body
+        headers = {}
+        if entry is not None:
+            if entry[2]:
+                headers['If-None-Match'] = entry[2]
+            if entry[3]:
+                headers['If-Modified-Since'] = entry[3]
+        try:
+            response = self.open_url(browser, url, timeout, headers=headers)
+        except Exception as e:
+            gc = getattr(e, 'getcode', lambda: -1)
+            if entry is None or gc() != 304:
+                raise
+            # Not modified: use the cached body and save the download
+            cache.revalidated(url, len(entry[0]), ttl)
+            if log is not None and loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('Page not modified, {0} bytes saved: {1}').format(len(entry[0]), url))
+            return entry[0]
+        body = response.read()
+        if cache is not None and body:
+            info = response.info()
+            try:
+                cache.put(url, body, ttl, etag=info.get('ETag'), last_modified=info.get('Last-Modified'))
+            except sqlite3.Error as e:
+                if log is not None:
+                    log.error(_('Response cache not writable: {0}').format(e))
+        return body
+
     # Perrypedia specific identification methods
 
     def comments_from_kreisarchiv(self, browser, series_code, issuenumber, log, loglevel):
@@ -1332,7 +2899,7 @@ class Perrypedia(Source):
             if loglevel in [self.loglevels['DEBUG']]:
                 log.info('url=', url)
             try:
-                page = browser.open_novisit(url, timeout=30).read().strip()
+                page = self.fetch_url(browser, url, 30, log, loglevel).strip()
                 if page:
                     soup = BeautifulSoup(page, 'html.parser')
                     if 'Kringels Meinung:' in soup.text:
@@ -1365,7 +2932,7 @@ class Perrypedia(Source):
             if loglevel == self.loglevels['DEBUG']:
                 log.info("Checking spoiler archive on https://forum.perry-rhodan.net/viewforum.php?f=110")
             url = 'https://forum.perry-rhodan.net/viewforum.php?f=110'
-            response = browser.open_novisit(url, timeout=30).read().strip()
+            response = self.fetch_url(browser, url, 30, log, loglevel).strip()
             if response:
                 soup = BeautifulSoup(response, 'html.parser')
                 if soup:
@@ -1425,7 +2992,7 @@ class Perrypedia(Source):
                 cycle_spoiler_link = 'https://forum.perry-rhodan.net/viewforum.php?f=4'
             if loglevel == self.loglevels['DEBUG']:
                 log.info("cycle_spoiler_link={0}".format(cycle_spoiler_link))
-            response = browser.open_novisit(cycle_spoiler_link, timeout=30).read().strip()
+            response = self.fetch_url(browser, cycle_spoiler_link, 30, log, loglevel).strip()
             if response:
                 soup = BeautifulSoup(response, 'html.parser')
                 if soup:
@@ -1477,7 +3044,7 @@ class Perrypedia(Source):
                             cycle_spoiler_link = cycle_spoiler_link + '&start=' + str(topic_page * 25)
                             if loglevel == self.loglevels['DEBUG']:
                                 log.info("cycle_spoiler_link={0}".format(cycle_spoiler_link))
-                            response = browser.open_novisit(cycle_spoiler_link, timeout=30).read().strip()
+                            response = self.fetch_url(browser, cycle_spoiler_link, 30, log, loglevel).strip()
                             if response:
                                 soup = BeautifulSoup(response, 'html.parser')
                                 if soup:
@@ -1518,7 +3085,7 @@ class Perrypedia(Source):
                         if loglevel == self.loglevels['DEBUG']:
                             log.info("spoiler_link={0}".format(spoiler_link))
                         # Open the issue spoiler page
-                        response = browser.open_novisit(spoiler_link, timeout=30).read().strip()
+                        response = self.fetch_url(browser, spoiler_link, 30, log, loglevel).strip()
                         if response:
                             soup = BeautifulSoup(response, 'html.parser')
                             if soup:
@@ -1684,11 +3251,11 @@ class Perrypedia(Source):
             log.info('preliminary_series_name=', preliminary_series_name)
 
         # ['Galacto City', 'PRSTO', 9, r'(galacto city - folge) (\d{1,2})'],
-        for subserie_list in self.subseries_offsets:
-            if loglevel in [self.loglevels['DEBUG']]:
-                log.info('subserie_list=', subserie_list)
-            if series_code == subserie_list[1] and preliminary_series_name == subserie_list[0]:
-                return issuenumber + subserie_list[2] - 1
+        offset = self.cycle_index.offset(series_code, preliminary_series_name)
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('offset=', offset)
+        if offset is not None:
+            return issuenumber + offset - 1
         return issuenumber
 
     def parse_title_authors_for_series_code_and_issuenumber(self, title, authors_str, log, loglevel):
@@ -1708,41 +3275,38 @@ class Perrypedia(Source):
         if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
             log.info(_('Searching in title and authors fields: {0} / {1}'.format(title, authors_str)))
 
-        for key in self.series_regex:
+        key, match = self.series_matcher.search(title + ' ' + authors_str)  # first matching pattern
+        if match:
             if loglevel in [self.loglevels['DEBUG']]:
                 log.info('Search pattern:', self.series_regex[key])
-            match = re.search(self.series_regex[key], title + ' ' + authors_str,
-                              re.IGNORECASE)  # check patterns until first match
-            if match:
-                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                    log.info(_('Match found for series code:'), key)
-                    if loglevel in [self.loglevels['DEBUG']]:
-                        log.info("Match at index {0}, {1}".format(match.start(), match.end()))
-                        log.info("Full match: {0}".format(match.group(0)))
-                        log.info("Number of groups:", len(match.groups()))
-                        for i in range(len(match.groups()) + 1):
-                            log.info("Group {0}: {1}".format(i, (match.group(i))))
-                series_code = key
-                # reduce match.group() to groups with content
-                # https://stackoverflow.com/questions/2498935/how-to-extract-the-first-non-null-match-from-a-group-of-regexp-matches-in-python
-                # functools.reduce(lambda x, y : (x, y)[x is None], match_groups, None)
-                nonempty_groups = []
-                for i in range(1, len(match.groups()) + 1):
-                    if loglevel in [self.loglevels['DEBUG']]:
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('Match found for series code:'), key)
+                if loglevel in [self.loglevels['DEBUG']]:
+                    log.info("Match at index {0}, {1}".format(match.start(), match.end()))
+                    log.info("Full match: {0}".format(match.group(0)))
+                    log.info("Number of groups:", len(match.groups()))
+                    for i in range(len(match.groups()) + 1):
                         log.info("Group {0}: {1}".format(i, (match.group(i))))
-                    if match.group(i) is not None:
-                        nonempty_groups.append(match.group(i))
+            series_code = key
+            # reduce match.group() to groups with content
+            # https://stackoverflow.com/questions/2498935/how-to-extract-the-first-non-null-match-from-a-group-of-regexp-matches-in-python
+            # functools.reduce(lambda x, y : (x, y)[x is None], match_groups, None)
+            nonempty_groups = []
+            for i in range(1, len(match.groups()) + 1):
                 if loglevel in [self.loglevels['DEBUG']]:
-                    ("Number of groups now:", len(nonempty_groups))
-                # Check position of issuenumber in search string
-                if nonempty_groups[1].isnumeric():
-                    preliminary_series_name = nonempty_groups[0]
-                    issuenumber = int(nonempty_groups[1])
-                else:
-                    if nonempty_groups[0].isnumeric():
-                        preliminary_series_name = ''
-                        issuenumber = int(nonempty_groups[0])
-                break
+                    log.info("Group {0}: {1}".format(i, (match.group(i))))
+                if match.group(i) is not None:
+                    nonempty_groups.append(match.group(i))
+            if loglevel in [self.loglevels['DEBUG']]:
+                ("Number of groups now:", len(nonempty_groups))
+            # Check position of issuenumber in search string
+            if nonempty_groups[1].isnumeric():
+                preliminary_series_name = nonempty_groups[0]
+                issuenumber = int(nonempty_groups[1])
+            else:
+                if nonempty_groups[0].isnumeric():
+                    preliminary_series_name = ''
+                    issuenumber = int(nonempty_groups[0])
 
         if series_code is not None and issuenumber is not None:
             # Besondere Behandlung für Buchpakete
@@ -1768,34 +3332,32 @@ class Perrypedia(Source):
         # Search in title and authors field (in some cases title and authors are inadvertently reversed
         if loglevel in [self.loglevels['DEBUG'], 20]:
             log.info(_('Searching subseries in title and authors:'), title + ' ' + authors_str)
-        for subserie in self.subseries_offsets:
-            # Search in title field
+        number, match = self.subseries_matcher.search(title + ' ' + authors_str)
+        if match:
+            subserie = self.subseries_offsets[number]
             if loglevel in [self.loglevels['DEBUG']]:
                 log.info('Searching with ', subserie[3])
-            match = re.search(subserie[3], title + ' ' + authors_str, re.IGNORECASE)
-            if match:
-                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                    log.info(_('Match found for '), subserie[0])
-                if loglevel in [self.loglevels['DEBUG']]:
-                    log.info('match.group(0)='), match.group(0)
-                nonempty_groups = []
-                for i in range(1, len(match.groups()) + 1):
-                    if loglevel in [self.loglevels['DEBUG']]:
-                        log.info("Group {0}: {1}".format(i, (match.group(i))))
-                    if match.group(i) is not None:
-                        nonempty_groups.append(match.group(i))
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('Match found for '), subserie[0])
+            if loglevel in [self.loglevels['DEBUG']]:
+                log.info('match.group(0)='), match.group(0)
+            nonempty_groups = []
+            for i in range(1, len(match.groups()) + 1):
                 if loglevel in [self.loglevels['DEBUG']]:
-                    log.info("Number of groups now:", len(nonempty_groups))
-                # Check position of issuenumber in search string
-                if nonempty_groups[1].isnumeric():
-                    subseries_issuenumber = int(nonempty_groups[1])
-                else:
-                    if nonempty_groups[0].isnumeric():
-                        subseries_issuenumber = int(nonempty_groups[0])
-                subseries = subserie[0]
-                series_code = subserie[1]
-                series_offset = subserie[2]
-                break
+                    log.info("Group {0}: {1}".format(i, (match.group(i))))
+                if match.group(i) is not None:
+                    nonempty_groups.append(match.group(i))
+            if loglevel in [self.loglevels['DEBUG']]:
+                log.info("Number of groups now:", len(nonempty_groups))
+            # Check position of issuenumber in search string
+            if nonempty_groups[1].isnumeric():
+                subseries_issuenumber = int(nonempty_groups[1])
+            else:
+                if nonempty_groups[0].isnumeric():
+                    subseries_issuenumber = int(nonempty_groups[0])
+            subseries = subserie[0]
+            series_code = subserie[1]
+            series_offset = subserie[2]
 
         if series_code is None or subseries_issuenumber is None:
             log.error(_('Subseries and/or subseries issuenumber not found.'))
@@ -1810,68 +3372,722 @@ class Perrypedia(Source):
 
         return series_code, issuenumber
 
-    def get_title_from_issuenumber(self, series_code, issuenumber, browser, timeout, log, loglevel):
+    def get_title_from_issuenumber(self, series_code, issuenumber, browser, timeout, log, loglevel):
+
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('Enter get_title_from_issuenumber()')
+            log.info('series_code=', series_code)
+            log.info('issuenumber=', issuenumber)
+
+        index = self.title_index(log)
+        entry = index.lookup_issue(series_code, issuenumber) if index is not None else None
+        if entry is not None:
+            if loglevel in [self.loglevels['DEBUG']]:
+                log.info('Title from index:', entry['title'])
+            title = entry['title']
+            if title.endswith(' (Roman)'):
+                title = title[:-8]
+            return title
+
+        if series_code in self.series_metadata_path:
+            url = self.base_url + self.series_metadata_path[series_code] + series_code + str(issuenumber)
+        else:
+            url = self.base_url + self.series_metadata_path['DEFAULT'] + series_code + str(issuenumber)
+        if series_code == 'PR':
+            url = url + '&redirect=yes'
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('url=', url)
+        page = self.fetch_url(browser, url, timeout, log, loglevel).strip()
+        soup = parse_html(page, 'heading')
+        # <h1 id="firstHeading" class="firstHeading" lang="de">Brigade der Sternenlotsen</h1>
+        title = soup.find(id='firstHeading').contents[0]
+        if title.endswith(' (Roman)'):
+            title = title[:-8]
+        return title
+
+    def get_raw_metadata_from_series_and_issuenumber(self, path, series_code, issuenumber, browser, timeout, log,
+                                                     loglevel):
+
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('Enter get_raw_metadata_from_series_and_issuenumber()')
+            log.info('series_code=', series_code)
+            log.info('issuenumber=', issuenumber)
+
+        # Get the metadata page for the book
+        if series_code in self.series_metadata_path:
+            if issuenumber > 0:  # Pseudo-Issunumber (single publications and anthology)
+                url = self.base_url + self.series_metadata_path[series_code] + series_code + str(issuenumber).strip()
+            else:
+                url = self.base_url + self.series_metadata_path[series_code] + series_code
+        else:
+            url = self.base_url + self.series_metadata_path['DEFAULT'] + series_code + str(issuenumber).strip()
+        if series_code == 'PR':
+            url = url + '&redirect=yes'
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('url=', url)
+        page_title = page_title_from_url(url) or ''
+        ppid = page_title[7:] if page_title.startswith('Quelle:') else None
+        if self.known_failure('page', page_title, log, loglevel):
+            return None
+        if self.prefs['use_wikitext']:
+            # The API resolves the redirect itself (and reads ahead the following ppids)
+            raw_metadata = self.get_raw_metadata_from_wikitext(url, browser, timeout, log, loglevel)
+            if raw_metadata is not None:
+                # Link to the book page itself, not to the redirect
+                return tuple(raw_metadata[:3]) + (self.canonical_url(ppid) or url,)
+        # Go straight to the book page, if the redirect of the ppid is known
+        canonical_url = self.canonical_url(ppid)
+        if canonical_url is not None:
+            if loglevel in [self.loglevels['DEBUG']]:
+                log.info('canonical url=', canonical_url)
+            try:
+                page = self.fetch_url(browser, canonical_url, timeout, log, loglevel).strip()
+                soup = parse_html(page, 'book')
+                return self.parse_pp_book_page(soup, browser, timeout, canonical_url, log, loglevel)
+            except Exception as e:
+                gc = getattr(e, 'getcode', lambda: -1)
+                log.info(_('Failed to get contents from url {0}, reason={1}. Following the redirect again.')
+                         .format(canonical_url, gc()))
+                self.forget_redirect(ppid, log)
+        try:
+            page = self.fetch_url(browser, url, timeout, log, loglevel).strip()
+            soup = parse_html(page, 'book')
+            if ppid is not None:
+                self.remember_redirect(page_title, page_heading(soup), log)
+            return self.parse_pp_book_page(soup, browser, timeout, url, log, loglevel)
+        except Exception as e:
+            # Get http return code, if provided
+            gc = getattr(e, 'getcode', lambda: -1)
+            log.exception(_('Failed to get contents from url, reason={0}.').format(gc()))
+            if gc() in [404, 410]:
+                # The page does not exist. Other errors (403, 429: the server is busy) are not remembered.
+                self.remember_failure('page', page_title, log)
+            return None
+
+
+    def get_raw_metadata_from_index(self, ppid, browser, timeout, log, loglevel):
+        """
+        Get the metadata of a ppid from the book page in the title index (the target of the "Quelle:" redirect).
+        Returns None, if the ppid is not in the index or its page could not be read, then the ppid is looked up online.
+        """
+        index = self.title_index(log)
+        try:
+            entry = index.lookup_ppid(ppid) if index is not None else None
+        except sqlite3.Error as e:
+            log.error(_('Title index not readable: {0}').format(e))
+            return None
+        if entry is None:
+            if index is not None and loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('PPID {0} not in the title index, looking it up online.').format(ppid))
+            return None
+        url = entry['url']
+        if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+            log.info(_('PPID {0} from the title index: {1}').format(ppid, url))
+        # Later lookups of the ppid (covers, bulk downloads) skip the redirect as well
+        self.remember_redirect('Quelle:' + ppid, entry['title'], log)
+        if self.prefs['use_wikitext']:
+            raw_metadata = self.get_raw_metadata_from_wikitext(url, browser, timeout, log, loglevel)
+            if raw_metadata is not None:
+                return tuple(raw_metadata[:3]) + (url,)
+        try:
+            page = self.fetch_url(browser, url, timeout, log, loglevel).strip()
+            soup = parse_html(page, 'book')
+            return self.parse_pp_book_page(soup, browser, timeout, url, log, loglevel)
+        except Exception as e:
+            gc = getattr(e, 'getcode', lambda: -1)
+            log.info(_('Failed to get contents from url {0}, reason={1}. Looking the PPID up online.')
+                     .format(url, gc()))
+            self.forget_redirect(ppid, log)
+            return None
+
+    def wikitext_url(self, page_title):
+        return self.api_url + urlencode({'action': 'parse', 'page': page_title, 'prop': 'wikitext', 'redirects': 1,
+                                         'format': 'json', 'formatversion': 2})
+
+    def get_wikitext(self, page_title, browser, timeout, log, loglevel):
+        """
+        Return the wikitext of a page (redirects resolved) or None.
+        For a ppid page (Quelle:PR1433), that follows the ppid asked for before (Quelle:PR1432), the following issues
+        of the series are fetched in the same request (option prefetch_issues), because a bulk download of a series
+        asks for consecutive issues. A single book does not cause a prefetch.
+        """
+        match = re.match(r'^Quelle:([A-Za-z]+)(\d+)$', page_title)
+        issue = (match.group(1), int(match.group(2))) if match else None
+        with self.cache_lock:
+            wikitexts = getattr(self, '_wikitexts', None)
+            if wikitexts is None:
+                wikitexts = self._wikitexts = OrderedDict()
+            previous_issue = getattr(self, '_wikitext_issue', None)
+            if issue is not None:
+                self._wikitext_issue = issue
+            if page_title in wikitexts:
+                return wikitexts.pop(page_title)
+        url = self.wikitext_url(page_title)
+        cache = self.response_cache()
+        try:
+            cached = cache.get_entry(url) if cache is not None else None
+        except sqlite3.Error:
+            cached = None
+        prefetch = int(self.prefs['prefetch_issues'] or 0)
+        consecutive = issue is not None and previous_issue == (issue[0], issue[1] - 1)
+        if prefetch > 1 and consecutive and (cached is None or cached[1] < time.time()):
+            series_code, issuenumber = issue
+            page_titles = ['Quelle:{0}{1}'.format(series_code, number)
+                           for number in range(issuenumber, issuenumber + min(prefetch, 50))]
+            try:
+                fetched = self.fetch_wikitexts(page_titles, browser, timeout, log, loglevel)
+            except Exception:
+                log.exception(_('Failed to get the wikitext of pages {0}.').format(page_titles))
+                fetched = None
+            if fetched is not None:
+                with self.cache_lock:
+                    for title, wikitext in fetched.items():
+                        if title != page_title:
+                            wikitexts.pop(title, None)
+                            wikitexts[title] = wikitext
+                    while len(wikitexts) > self.max_prefetched_wikitexts:
+                        wikitexts.popitem(last=False)
+                return fetched.get(page_title)
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('url=', url)
+        try:
+            response = json.loads(self.fetch_url(browser, url, timeout, log, loglevel).strip())
+            self.remember_redirect(page_title, response['parse'].get('title'), log)
+            return response['parse']['wikitext']
+        except Exception:
+            return None
+
+    def fetch_wikitexts(self, page_titles, browser, timeout, log, loglevel):
+        """
+        Get the wikitext of many pages with as few requests as possible (50 titles per request, redirects resolved).
+        Returns a dict page_title: wikitext for the existing pages. Each page is also stored in the response cache
+        as the response for its own wikitext url, so a single page request is served from the cache.
+        """
+        # https://www.perrypedia.de/mediawiki/api.php?action=query&prop=revisions&rvprop=content&rvslots=main
+        # &redirects=1&format=json&formatversion=2&titles=Quelle:PR1433|Quelle:PR1434
+        # {"query": {"redirects": [{"from": "Quelle:PR1433", "to": "Brigade der Sternenlotsen"}, ...],
+        #  "pages": [{"pageid": 1234, "title": "Brigade der Sternenlotsen",
+        #  "revisions": [{"slots": {"main": {"content": "{{Roman ..."}}}]}, ...]}}
+        wikitexts = {}
+        cache = self.response_cache()
+        for start in range(0, len(page_titles), 50):
+            batch = page_titles[start:start + 50]
+            url = self.api_url + urlencode({'action': 'query', 'prop': 'revisions', 'rvprop': 'content',
+                                            'rvslots': 'main', 'redirects': 1, 'format': 'json',
+                                            'formatversion': 2, 'titles': '|'.join(batch)})
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('Fetching the wikitext of {0} pages in one request.').format(len(batch)))
+            response = json.loads(self.fetch_url(browser, url, timeout, log, loglevel).strip())
+            query = response.get('query', {})
+            targets = {}
+            for entry in query.get('normalized', []) + query.get('redirects', []):
+                targets[entry['from']] = entry['to']
+            contents = {}
+            for page in query.get('pages', []):
+                revisions = page.get('revisions')
+                if not revisions:
+                    continue
+                revision = revisions[0]
+                content = revision.get('slots', {}).get('main', {}).get('content', revision.get('content'))
+                if content is not None:
+                    contents[page['title']] = content
+            for page_title in batch:
+                title = page_title
+                for _hop in range(3):  # normalized, then redirected (maybe twice)
+                    if title in contents or title not in targets:
+                        break
+                    title = targets[title]
+                if title not in contents:
+                    continue
+                wikitexts[page_title] = contents[title]
+                self.remember_redirect(page_title, title, log)
+                if cache is not None:
+                    body = json.dumps({'parse': {'title': title, 'wikitext': contents[title]}}).encode('utf-8')
+                    try:
+                        cache.put(self.wikitext_url(page_title), body)
+                    except sqlite3.Error as e:
+                        log.error(_('Response cache not writable: {0}').format(e))
+        return wikitexts
+
+    def get_raw_metadata_from_wikitext(self, source_url, browser, timeout, log, loglevel):
+        """
+        Get overview, plot and covers of a standard book page from the wikitext of the page (action=parse).
+        The parameters of the overview template are the rows of the overview table. Returns None, if the page
+        has no usable overview template (special pages), then the rendered page has to be parsed.
+        """
+        page_title = page_title_from_url(source_url)
+        if not page_title:
+            return None
+        wikitext = self.get_wikitext(page_title, browser, timeout, log, loglevel)
+        if wikitext is None:
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('No wikitext for page {0}, parsing the html page.').format(page_title))
+            return None
+
+        overview, file_names = self.parse_overview_template(wikitext, log, loglevel)
+        if overview is None:
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('No overview template in wikitext of page {0}, parsing the html page.').format(page_title))
+            return None
 
+        # Plot: the paragraphs of section "Handlung" ("Inhalt" on special pages like the book packages), up to the
+        # next section of the same level
+        plot = ''
+        match = re.search(r'^==\s*(?:Handlung|Inhalt)\s*==\s*$(.*?)(?=^==[^=]|\Z)', wikitext, flags=re.M | re.S)
+        if match:
+            section = re.sub(r'^=+[^=\n]+=+\s*$', '\n', match.group(1), flags=re.M)  # subsection headers
+            section = re.sub(r'<br\s*/?>', ' ', section, flags=re.I)
+            for paragraph in re.split(r'\n\s*\n', section):
+                if paragraph.strip().startswith(('{{', '[[Datei:', '[[Kategorie:')):
+                    continue
+                paragraph = strip_wiki_markup(paragraph)
+                if paragraph:
+                    plot = plot + paragraph + '<br />'
         if loglevel in [self.loglevels['DEBUG']]:
-            log.info('Enter get_title_from_issuenumber()')
-            log.info('series_code=', series_code)
-            log.info('issuenumber=', issuenumber)
+            log.info('plot (abbr.)=', plot[:200])
 
-        if series_code in self.series_metadata_path:
-            url = self.base_url + self.series_metadata_path[series_code] + series_code + str(issuenumber)
-        else:
-            url = self.base_url + self.series_metadata_path['DEFAULT'] + series_code + str(issuenumber)
-        if series_code == 'PR':
-            url = url + '&redirect=yes'
+        # Covers: the files named in the overview template
+        cover_page_hrefs = ['/wiki/Datei:' + quote(file_name.replace(' ', '_')) for file_name in file_names]
+        cover_urls = self.resolve_cover_urls(cover_page_hrefs, 'fullMedia', browser, timeout, log, loglevel)
         if loglevel in [self.loglevels['DEBUG']]:
-            log.info('url=', url)
-        page = browser.open_novisit(url, timeout=timeout).read().strip()
-        soup = BeautifulSoup(page.text, 'html.parser')
-        # <h1 id="firstHeading" class="firstHeading" lang="de">Brigade der Sternenlotsen</h1>
-        title = soup.find(id='firstHeading').contents[0]
-        if title.endswith(' (Roman)'):
-            title = title[:-8]
-        return title
+            log.info('overview=', overview)
+            log.info('cover_urls=', cover_urls)
+        return overview, plot, cover_urls, source_url
 
-    def get_raw_metadata_from_series_and_issuenumber(self, path, series_code, issuenumber, browser, timeout, log,
-                                                     loglevel):
+    def page_sections(self, page_title, browser, timeout, log, loglevel):
+        """
+        The sections of a page (action=parse&prop=sections), as a list of dicts with 'line' (heading) and 'index'
+        (section number for action=parse&section=). A page asked for again is served from the response cache.
+        """
+        # https://www.perrypedia.de/mediawiki/api.php?action=parse&page=Quelle:PR1433&prop=sections&redirects=1
+        # &format=json&formatversion=2
+        # {"parse": {"title": "Brigade der Sternenlotsen", "sections": [{"toclevel": 1, "level": "2",
+        #  "line": "Handlung", "number": "1", "index": "1", "anchor": "Handlung", ...}, ...]}}
+        url = self.api_url + urlencode({'action': 'parse', 'page': page_title, 'prop': 'sections', 'redirects': 1,
+                                        'format': 'json', 'formatversion': 2})
+        try:
+            response = json.loads(self.fetch_url(browser, url, timeout, log, loglevel).strip())
+        except Exception as e:
+            log.error(_('Sections of page {0} not available: {1}').format(page_title, e))
+            return []
+        return response.get('parse', {}).get('sections', [])
 
-        if loglevel in [self.loglevels['DEBUG']]:
-            log.info('Enter get_raw_metadata_from_series_and_issuenumber()')
-            log.info('series_code=', series_code)
-            log.info('issuenumber=', issuenumber)
+    def get_extra_sections(self, source_url, browser, timeout, log, loglevel):
+        """
+        Download the book page sections the user enabled (option extra_sections), one API request per section.
+        Returns a list of (heading, text) in the order of the option. Without enabled sections nothing is
+        downloaded.
+        """
+        names = [name.strip() for name in (self.prefs['extra_sections'] or '').split(',') if name.strip()]
+        names = [name for name in names if name.casefold() != 'handlung']  # the plot is already in the comments
+        page_title = page_title_from_url(source_url) if names else None
+        if not page_title:
+            return []
+        sections = {}
+        for section in self.page_sections(page_title, browser, timeout, log, loglevel):
+            heading = re.sub(r'<[^>]+>', '', section.get('line', ''))  # the heading is html, e. g. <i>SOL</i>
+            sections.setdefault(html.unescape(heading).strip().casefold(), (heading, section))
+        extra_sections = []
+        for name in names:
+            heading, section = sections.get(name.casefold(), (name, None))
+            if section is None:
+                if loglevel in [self.loglevels['DEBUG']]:
+                    log.info('No section {0} in page {1}'.format(name, page_title))
+                continue
+            # https://www.perrypedia.de/mediawiki/api.php?action=parse&page=Quelle:PR1433&section=3&prop=text
+            # &disableeditsection=1&disablelimitreport=1&redirects=1&format=json&formatversion=2
+            url = self.api_url + urlencode({'action': 'parse', 'page': page_title, 'section': section['index'],
+                                            'prop': 'text', 'disableeditsection': 1, 'disablelimitreport': 1,
+                                            'redirects': 1, 'format': 'json', 'formatversion': 2})
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('Fetching section {0} of page {1}.').format(name, page_title))
+            try:
+                response = json.loads(self.fetch_url(browser, url, timeout, log, loglevel).strip())
+            except Exception as e:
+                log.error(_('Section {0} of page {1} not available: {2}').format(name, page_title, e))
+                continue
+            soup = parse_html(response.get('parse', {}).get('text', ''))
+            text = ''
+            for tag in section_tags(soup, section.get('anchor'), names=('p', 'dl', 'ul', 'ol')):
+                if tag.name in ('ul', 'ol'):
+                    text = text + ''.join(item.text.strip() + '<br />' for item in tag.find_all('li'))
+                else:
+                    text = text + tag.text.strip() + '<br />'
+            if text:
+                extra_sections.append((heading, text))
+        return extra_sections
 
-        # Get the metadata page for the book
-        if series_code in self.series_metadata_path:
-            if issuenumber > 0:  # Pseudo-Issunumber (single publications and anthology)
-                url = self.base_url + self.series_metadata_path[series_code] + series_code + str(issuenumber).strip()
-            else:
-                url = self.base_url + self.series_metadata_path[series_code] + series_code
-        else:
-            url = self.base_url + self.series_metadata_path['DEFAULT'] + series_code + str(issuenumber).strip()
-        if series_code == 'PR':
-            url = url + '&redirect=yes'
-        if loglevel in [self.loglevels['DEBUG']]:
-            log.info('url=', url)
+    def parse_overview_template(self, wikitext, log, loglevel):
+        """
+        Find the overview template in wikitext and return (overview, file_names) with the same keys and values as
+        the rows of the rendered overview table ('Serie:', 'Titel:', ...) and the names of the cover files.
+        Returns (None, []), if there is no template with the data needed for a book.
+        """
+        for template_name, params in parse_wiki_templates(wikitext):
+            named = [(name, value) for name, value in params.items() if not name.isdigit()]
+            if not named:
+                continue
+            overview = {}
+            file_names = []
+            for name, value in named:
+                # Cover files: [[Datei:PR1433.jpg|...]] or a plain file name
+                for file_name in re.findall(r'\[\[(?:Datei|File|Bild|Image):([^|\]]+)', value, flags=re.I):
+                    file_names.append(file_name.strip())
+                if re.match(r'^[^|\[\]{}<>]+\.(?:jpe?g|png|gif)$', value.strip(), flags=re.I):
+                    file_names.append(value.strip())
+                    continue
+                text = strip_wiki_markup(value)
+                if not text:
+                    continue
+                name = name.replace('_', ' ').strip()
+                label = self.overview_template_parameters.get(name.lower(), name[:1].upper() + name[1:]) + ':'
+                overview[label] = text
+                # The copyright of the cover is the publisher (like the third column of the 'Serie:' row)
+                if text.startswith('©') and 'Verlag:' not in overview:
+                    overview['Verlag:'] = text
+            # Series with number, like the rendered row: 'Perry Rhodan-Heftserie (Band 1433)'
+            serie = overview.get('Serie:', '')
+            number_key = next((key for key in ('Band:', 'Nummer:', 'Nr.:') if key in overview), None)
+            if serie and not re.search(r'\d', serie) and number_key is not None:
+                # The number is no row of its own in the rendered table
+                overview['Serie:'] = '{0} (Band {1})'.format(serie, overview.pop(number_key))
+            # Use the template only, if it has what parse_raw_metadata needs for a book
+            if overview.get('Titel:') and re.search(r'\d', overview.get('Serie:', '')) \
+                    and self.series_name_index.find(overview['Serie:']):
+                if loglevel in [self.loglevels['DEBUG']]:
+                    log.info('Overview template:', template_name)
+                return overview, file_names
+        return None, []
+
+    def completed_futures(self, futures, timeout, abort):
+        """
+        Yield the futures in the order they complete (futures completed at the same time in the given order), but
+        only for timeout seconds and only until abort is set.
+        """
+        deadline = time.time() + timeout
+        pending = list(futures)
+        while pending:
+            if abort is not None and abort.is_set():
+                return
+            done, not_done = wait(pending, timeout=min(0.5, max(deadline - time.time(), 0.01)),
+                                  return_when=FIRST_COMPLETED)
+            if not done and time.time() >= deadline:
+                raise FutureTimeoutError()
+            for future in [future for future in pending if future in done]:
+                yield future
+            pending = [future for future in pending if future in not_done]
+
+    def fetch_book_candidate(self, book_key, book_values, timeout, log, loglevel):
+        """
+        Download and parse a candidate page of the title search. Returns the soup, if the page is a book page,
+        otherwise None. Runs in a worker thread, so use an own browser instance.
+        If the canonical book page of the ppid fails, the "Quelle:" redirect is followed again and book_values is
+        updated with its url.
+        """
+        ppid = book_values[0]
+        quelle_url = self.base_url + '/wiki/Quelle:' + quote(ppid) if ppid else None
         try:
-            page = browser.open_novisit(url, timeout=timeout).read().strip()
-            soup = BeautifulSoup(page, 'html.parser')
-            return self.parse_pp_book_page(soup, browser, timeout, url, log, loglevel)
+            page = self.fetch_url(self.browser, book_values[1], timeout, log, loglevel).strip()
         except Exception as e:
-            # Get http return code, if provided
+            if quelle_url is None or book_values[1] == quelle_url:
+                raise
             gc = getattr(e, 'getcode', lambda: -1)
-            log.exception(_('Failed to get contents from url, reason={0}.').format(gc()))
+            log.info(_('Failed to get contents from url {0}, reason={1}. Following the redirect again.')
+                     .format(book_values[1], gc()))
+            self.forget_redirect(ppid, log)
+            book_values[1] = quelle_url
+            page = self.fetch_url(self.browser, book_values[1], timeout, log, loglevel).strip()
+        soup = parse_html(page, 'book')
+        if book_values[1] == quelle_url:
+            self.remember_redirect('Quelle:' + ppid, page_heading(soup), log)
+        if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+            log.info(_('Page title:'), page_heading(soup))
+        if 'Hörbuch' in book_key or '(' not in book_key:
+            overview_div = soup.find('div', {'id': 'mw-content-text'})
+        else:
+            overview_div = soup.find('div', {'class': 'perrypedia_std_rframe overview'})
+        if overview_div is None:
             return None
+        return soup
+
+    def resolve_disambiguation(self, page_title, browser, timeout, log, loglevel):
+        """
+        The books linked from a disambiguation page as dict {title: [ppid, url]}, from an API request for the links
+        of the page with their categories (redirects resolved, continued if the answer is split by the API limits)
+        instead of the rendered page. Books are the links to
+        a ppid ("Quelle:") with a book variant or no variant in the title, nested disambiguation pages are pruned.
+        The result is cached per disambiguation page.
+        """
+        # https://www.perrypedia.de/mediawiki/api.php?action=query&titles=Das Erbe der Yulocs (Begriffsklärung)
+        # &generator=links&gpllimit=max&prop=categories|pageprops&redirects=1&format=json&formatversion=2
+        # {"query": {"redirects": [{"from": "Quelle:PR630", "to": "Das Erbe der Yulocs"},
+        #  {"from": "Quelle:SE71", "to": "Das Erbe der Yulocs (Hörbuch)"}, ...],
+        #  "pages": [{"title": "Das Erbe der Yulocs", "categories": [...]}, ...]}}
+        with self.cache_lock:
+            disambiguations = getattr(self, '_disambiguations', None)
+            if disambiguations is None:
+                disambiguations = self._disambiguations = {}
+            if page_title in disambiguations:
+                return dict(disambiguations[page_title])
+        index = self.title_index(log)
+        namespace = index.get_meta('namespace') if index is not None else None
+        params = {'action': 'query', 'titles': page_title, 'generator': 'links', 'gpllimit': 'max',
+                  'prop': 'categories|pageprops', 'cllimit': 'max', 'redirects': 1, 'format': 'json',
+                  'formatversion': 2}
+        if namespace is not None:
+            params['gplnamespace'] = namespace
+        try:
+            targets, pages = self.query_pages(params, browser, timeout, log, loglevel)
+        except Exception as e:
+            log.error(_('Links of disambiguation page {0} not available: {1}').format(page_title, e))
+            return {}
+        books = {}
+        for source, title in targets.items():
+            if not source.startswith('Quelle:'):
+                continue
+            ppid = source.split(':', 1)[1]
+            page = pages.get(title, {})
+            match = re.search(r'\(([^()]*)\)$', title)
+            variant = match.group(1) if match else ''
+            categories = [category['title'].casefold() for category in page.get('categories', [])]
+            if page.get('missing') or 'disambiguation' in page.get('pageprops', {}) or '(Begriffsklärung)' in title \
+                    or any('begriffsklärung' in category for category in categories):
+                if loglevel in [self.loglevels['DEBUG']]:
+                    log.info('Nested disambiguation page pruned:', title)
+                continue
+            if variant and variant not in self.book_variants:
+                continue
+            self.remember_redirect(source, title, log)
+            books[title] = [ppid, self.book_page_url(ppid)]
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('Books of disambiguation page {0}: {1}'.format(page_title, books))
+        with self.cache_lock:
+            disambiguations[page_title] = dict(books)
+        return books
+
+    def query_pages(self, params, browser, timeout, log, loglevel):
+        """
+        Send an API query (action=query with prop and/or generator) and follow its continuation: the lists of a page
+        (categories, redirects) and the pages of a generator may be split over several answers.
+        Returns the normalized and redirected titles {from: to} and the pages {title: page} with their lists merged.
+        """
+        targets = {}
+        pages = {}
+        continuation = {}
+        while True:
+            url = self.api_url + urlencode(dict(params, **continuation))
+            response = json.loads(self.fetch_url(browser, url, timeout, log, loglevel).strip())
+            query = response.get('query', {})
+            for entry in query.get('normalized', []) + query.get('redirects', []):
+                targets[entry['from']] = entry['to']
+            for page in query.get('pages', []):
+                merged = pages.setdefault(page['title'], {})
+                for key, value in page.items():
+                    if isinstance(value, list):
+                        merged.setdefault(key, []).extend(value)
+                    elif isinstance(value, dict):
+                        merged.setdefault(key, {}).update(value)
+                    else:
+                        merged[key] = value
+            continuation = response.get('continue')
+            if not continuation:
+                break
+        return targets, pages
+
+    def is_book_category(self, name):
+        """
+        True, if the category (Kategorie:Perry Rhodan-Heftroman) is a category of books: its main word, the last
+        word of the name without a qualifier in parentheses or after 'von', 'aus', ..., ends with one of
+        book_page_keywords. Categories of persons and places (Romanfigur, Buchautor, Schauplatz in Romanen) do not.
+        """
+        name = name.split(':', 1)[-1].casefold()
+        name = re.sub(r'\s*\([^()]*\)$', '', name)
+        name = re.split(r'\s+(?:von|aus|der|des|nach|mit|im|in)\s+', name)[0]
+        word = re.split(r'[\s\-–]+', name.strip())[-1]
+        return any(re.match(r'^\w*' + keyword + r'(?:e|en|n|s)?$', word) for keyword in self.book_page_keywords)
+
+    def filter_book_pages(self, title_list, url_list, browser, timeout, log, loglevel):
+        """
+        Keep only the search hits that are book pages, without downloading them: the categories and redirects of all
+        hits are requested in one API request (50 titles each, continued if the answer is split by the API limits).
+        A book page is the target of a "Quelle:" redirect (its ppid) or has a category of a book
+        (is_book_category). If the answer is not available, the hits are kept.
+        """
+        # https://www.perrypedia.de/mediawiki/api.php?action=query&prop=categories|pageprops|redirects
+        # &titles=Die dritte Macht|Die dritte Macht (Comic)&cllimit=max&rdlimit=max&redirects=1
+        # &format=json&formatversion=2
+        # {"query": {"pages": [{"title": "Die dritte Macht (Comic)", "categories": [{"title": "Kategorie:Comic"}],
+        #  "redirects": [{"title": "Quelle:PRCCC1"}]}, ...]}}
+        index = self.title_index(log)
+        namespace = index.get_meta('namespace') if index is not None else None
+        kept_titles = []
+        kept_urls = []
+        for start in range(0, len(title_list), 50):
+            batch = list(zip(title_list[start:start + 50], url_list[start:start + 50]))
+            params = {'action': 'query', 'prop': 'categories|pageprops|redirects',
+                      'titles': '|'.join(title for title, url in batch), 'cllimit': 'max', 'rdlimit': 'max',
+                      'rdprop': 'title', 'redirects': 1, 'format': 'json', 'formatversion': 2}
+            if namespace is not None:
+                params['rdnamespace'] = namespace
+            try:
+                targets, pages = self.query_pages(params, browser, timeout, log, loglevel)
+            except Exception as e:
+                log.error(_('Page properties of the search hits not available: {0}').format(e))
+                kept_titles.extend(title for title, url in batch)
+                kept_urls.extend(url for title, url in batch)
+                continue
+            for title, url in batch:
+                target = title
+                for _hop in range(3):  # normalized, then redirected (maybe twice)
+                    if target in pages or target not in targets:
+                        break
+                    target = targets[target]
+                page = pages.get(target)
+                if page is None or page.get('missing') or 'disambiguation' in page.get('pageprops', {}):
+                    is_book = False
+                else:
+                    names = [entry['title'] for entry in page.get('categories', [])]
+                    is_book = any(redirect['title'].startswith('Quelle:') for redirect in page.get('redirects', [])) \
+                        or any(self.is_book_category(name) for name in names)
+                if is_book:
+                    kept_titles.append(title)
+                    kept_urls.append(url)
+                elif loglevel in [self.loglevels['DEBUG']]:
+                    log.info('Not a book page, skipped:', title)
+        if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+            log.info(_('{0} of {1} search hits are book pages.').format(len(kept_titles), len(title_list)))
+        return kept_titles, kept_urls
+
+    def search_titles(self, search_text, browser, timeout, log, loglevel):
+        """
+        Find all pages with search_text in their title with the mediawiki search (opensearch).
+        Returns the list of page titles, the list of page urls and the titles as one string.
+        """
+        # Find all pages with searchstring in title with mediawiki search
+        url = self.api_url + 'action=opensearch&namespace=0&search=' \
+              + search_text + '&limit=100&profile=normal-subphrases&format=json'
+        # https://www.perrypedia.de/mediawiki/api.php?action=opensearch&namespace=0&search=Das Erbe der Yulocs&limit=10&format=json
+        # url encoding is doing by the browser object:
+        # https://www.perrypedia.de/mediawiki/api.php?action=opensearch&namespace=0&search=Das%20Erbe%20der%20Yulocs&limit=10&format=json
+        # url = search_base_url + urllib.parse.quote(search_text) + '&title=Spezial%3ASuche'
+        if self.known_failure('opensearch', title_key(search_text), log, loglevel):
+            return [], [], ''
+        if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+            log.info(_('API search with: "{0}"...').format(search_text))
+            log.info(_('GET url: "{0}"').format(url))
+        response_text = self.fetch_url(browser, url, timeout, log, loglevel).strip()
+        response_list = json.loads(response_text)
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('response_list=', response_list)
+        # Search response for book pages.
+        # ['Ordoban',
+        #     ['Ordoban', 'Ordoban (Begriffsklärung)', 'Ordoban (Hörbuch)', 'Ordoban (Roman)', 'Ordoban (Silberband)'],
+        #     ['', '', '', '', ''],
+        #     ['https://www.perrypedia.de/wiki/Ordoban', 'https://www.perrypedia.de/wiki/Ordoban_(Begriffskl%C3%A4rung)', 'https://www.perrypedia.de/wiki/Ordoban_(H%C3%B6rbuch)', 'https://www.perrypedia.de/wiki/Ordoban_(Roman)', 'https://www.perrypedia.de/wiki/Ordoban_(Silberband)']
+        # ]
+        # <div class="mw-parser-output"><p>Der Begriff <b>Ordoban</b> wird mehrfach verwendet:
+        # <ul><li>für <i>die Person</i>, siehe: <b><a href="/wiki/Ordoban" title="Ordoban">Ordoban</a></b></li></ul>
+        # <ul><li>für <i>den <a href="/wiki/Perry_Rhodan-Heftromane" title="Perry Rhodan-Heftromane">Heftroman</a></i>, siehe: <b><a href="/wiki/Quelle:PR1200" class="mw-redirect" title="Quelle:PR1200">ORDOBAN (Roman)</a></b></li>
+        # <li>für <i>das <a href="/wiki/H%C3%B6rbuch" class="mw-redirect" title="Hörbuch">Hörbuch</a></i>, siehe: <b><a href="/wiki/Quelle:SE143" class="mw-redirect" title="Quelle:SE143">Ordoban (Hörbuch)</a></b></li>
+        # <li>für <i>den <a href="/wiki/Silberband" class="mw-redirect" title="Silberband">Silberband</a></i>, siehe: <b><a href="/wiki/Quelle:PRHC143" class="mw-redirect" title="Quelle:PRHC143">Ordoban (Silberband)</a></b></li></ul>
+        #
+        # ['Die Dritte Macht',
+        #     ['Die dritte Macht', 'Die Dritte Macht (Begriffsklärung)', 'Die dritte Macht (Comic)', 'Die Dritte Macht (Handlungsebenen)'],
+        #     ['', '', '', ''],
+        #     ['https://www.perrypedia.de/wiki/Die_dritte_Macht', 'https://www.perrypedia.de/wiki/Die_Dritte_Macht_(Begriffskl%C3%A4rung)', 'https://www.perrypedia.de/wiki/Die_dritte_Macht_(Comic)', 'https://www.perrypedia.de/wiki/Die_Dritte_Macht_(Handlungsebenen)']
+        # ]
+        # ['Perry Rhodan Chronik',
+        #     ['Perry Rhodan Chronik'],
+        #     [''],
+        #     ['https://www.perrypedia.de/wiki/Perry_Rhodan_Chronik']
+        # ]
+        # ['Das Erbe der Yulocs',
+        #     ['Das Erbe der Yulocs', 'Das Erbe der Yulocs (Begriffsklärung)', 'Das Erbe der Yulocs (Hörbuch)', 'Das Erbe der Yulocs (Silberband)'],
+        #     ['', '', '', ''],
+        #     ['https://www.perrypedia.de/wiki/Das_Erbe_der_Yulocs', 'https://www.perrypedia.de/wiki/Das_Erbe_der_Yulocs_(Begriffskl%C3%A4rung)', 'https://www.perrypedia.de/wiki/Das_Erbe_der_Yulocs_(H%C3%B6rbuch)', 'https://www.perrypedia.de/wiki/Das_Erbe_der_Yulocs_(Silberband)']
+        # ]
+        # Search with substring
+        # https://www.perrypedia.de/mediawiki/api.php?action=opensearch&namespace=0&search=Gucky&limit=10&format=json
+        # ["Gucky",
+        # ["Gucky","Gucky (Begriffsklärung)","Gucky (PR Neo)","Gucky (Urucher)","Gucky auf AIKKAUD","Gucky II","Gucky kehrt zurück","Gucky und das Zeitraumschiff","Gucky und das Zeitraumschiff / Die Schwarze Macht","Gucky und der Golem"],
+        # ["","","","","","","","","",""],
+        # ["https://www.perrypedia.de/wiki/Gucky","https://www.perrypedia.de/wiki/Gucky_(Begriffskl%C3%A4rung)","https://www.perrypedia.de/wiki/Gucky_(PR_Neo)","https://www.perrypedia.de/wiki/Gucky_(Urucher)","https://www.perrypedia.de/wiki/Gucky_auf_AIKKAUD","https://www.perrypedia.de/wiki/Gucky_II","https://www.perrypedia.de/wiki/Gucky_kehrt_zur%C3%BCck","https://www.perrypedia.de/wiki/Gucky_und_das_Zeitraumschiff","https://www.perrypedia.de/wiki/Gucky_und_das_Zeitraumschiff_/_Die_Schwarze_Macht","https://www.perrypedia.de/wiki/Gucky_und_der_Golem"]]
+        # ]
+        # https://www.perrypedia.de/wiki/Gucky_(Begriffskl%C3%A4rung)
+        # <div class="mw-parser-output"><p>Der Begriff <b>Gucky</b> wird mehrfach verwendet:
+        # <ul><li>für <i>den <a href="/wiki/Mausbiber" class="mw-redirect" title="Mausbiber">Mausbiber</a></i>, siehe: <b><a href="/wiki/Gucky" title="Gucky">Gucky</a></b></li>
+        # <li>für <i>den <a href="/wiki/Urucher" title="Urucher">Urucher</a></i>, siehe: <b><a href="/wiki/Gucky_(Urucher)" class="mw-redirect" title="Gucky (Urucher)">Gucky (Urucher)</a></b></li></ul>
+        # <p>Ähnliche Begriffe:
+        # <ul><li>für <i>Guckys negatives Spiegelbild im <a href="/wiki/Anti-Universum" title="Anti-Universum">Anti-Universum</a></i>, siehe: <b><a href="/wiki/Gucky_II" title="Gucky II">Gucky&nbsp;II</a></b></li>
+        # <li>für <i>den <a href="/wiki/Planet" title="Planet">Planeten</a> in <a href="/wiki/M_82" class="mw-redirect" title="M 82">M&nbsp;82</a></i>, siehe: <b><a href="/wiki/Gucklon" class="mw-redirect" title="Gucklon">Gucklon</a></b></li>
+        # <li>für <i>die eidechsenartigen Tiere</i>, siehe: <b><a href="/wiki/Gucky-Olm" title="Gucky-Olm">Gucky-Olm</a></b></li>
+        # <li>für <i>den einzigen <a href="/wiki/Mond" title="Mond">Mond</a> des <a href="/wiki/Planet" title="Planet">Planeten</a> <a href="/wiki/Vurga" title="Vurga">Vurga</a></i>, siehe: <b><a href="/wiki/Guckys_Home" title="Guckys Home">Guckys Home</a></b></li>
+        # <li>für <i>den fünften <a href="/wiki/Planet" title="Planet">Planeten</a> der <a href="/wiki/Sonne" class="mw-redirect" title="Sonne">Sonne</a> <a href="/wiki/Drink" title="Drink">Drink</a></i>, siehe: <b><a href="/wiki/Guckys_Inn" title="Guckys Inn">Guckys Inn</a></b></li>
+        # <li>für <i>den <a href="/wiki/Planet" title="Planet">Planeten</a> in der <a href="/wiki/Galaxie" title="Galaxie">Galaxie</a> <a href="/wiki/Karo-1001" class="mw-redirect" title="Karo-1001">Karo-1001</a></i>, siehe: <b><a href="/mediawiki/index.php?title=Guckys_Rast&amp;action=edit&amp;redlink=1" class="new" title="Guckys Rast (Seite nicht vorhanden)">Guckys Rast</a></b></li>
+        # <li>für <i>die <a href="/wiki/Mikrobuch" title="Mikrobuch">Mikrobuch</a>-Serie</i>, siehe: <b>»<a href="/wiki/Gucky,_der_Retter_des_Universums" title="Gucky, der Retter des Universums">Gucky, der Retter des Universums</a>«</b></li>
+        # <li>für <i>die <a href="/wiki/Trivideo" title="Trivideo">Trivideo</a>-Sitcom</i>, siehe: <b>»<a href="/wiki/Guckys_Abenteuer_auf_der_Gem%C3%BCse-Ranch" class="mw-redirect" title="Guckys Abenteuer auf der Gemüse-Ranch">Guckys Abenteuer auf der Gemüse-Ranch</a>«</b></li>
+        # <li>für <i>das Stoff-Kuscheltier</i>, siehe: <b><a href="/wiki/Pl%C3%BCsch-Gucky" title="Plüsch-Gucky">Plüsch-Gucky</a></b></li></ul>
+        # <p><br>
+        # </p>
+        # <hr>
+        # <div style="border:1px solid #fff; padding:3px !important; background-color: #fff; overflow:hidden; clear:right; float:right; border-width:.3em 0 .3em 1.4em;"><div style="text-align:left;font-size:80%"><a href="/wiki/Datei:PRNeo_Schriftzug.jpg" class="image"><img alt="PRNeo Schriftzug.jpg" src="/mediawiki/images/thumb/3/36/PRNeo_Schriftzug.jpg/100px-PRNeo_Schriftzug.jpg" decoding="async" width="100" height="33" srcset="/mediawiki/images/thumb/3/36/PRNeo_Schriftzug.jpg/150px-PRNeo_Schriftzug.jpg 1.5x, /mediawiki/images/3/36/PRNeo_Schriftzug.jpg 2x"></a><br></div></div>
+        # <ul><li>für <i>den <a href="/wiki/Mausbiber_(PR_Neo)" class="mw-redirect" title="Mausbiber (PR Neo)">Mausbiber</a></i>, siehe: <b><a href="/wiki/Gucky_(PR_Neo)" title="Gucky (PR Neo)">Gucky (PR Neo)</a></b></li></ul>
+        # </div>
+
+        title_list = list(response_list[1])
+        titles = '\t'.join(title_list)
+        url_list = list(response_list[3])
+        if not title_list:
+            self.remember_failure('opensearch', title_key(search_text), log, url)
+        if loglevel in [self.loglevels['DEBUG']]:
+            log.info('title_list=', title_list)
+            log.info('url_list=', url_list)
+        return title_list, url_list, titles
 
+    def confident_candidate(self, search_text, candidates):
+        """
+        The candidate (book_key, book_values) whose title is exactly the search text (normalized, without a book
+        variant like "(Roman)"), or None. A title without variant is preferred, then "(Roman)" and "(Heftroman)".
+        """
+        exact = []
+        for rank, (book_key, book_values) in enumerate(candidates):
+            match = re.match(r'^(.*?)\s*\(([^()]*)\)$', book_key)
+            base_title, variant = (match.group(1), match.group(2)) if match else (book_key, '')
+            if variant and variant not in self.book_variants:
+                continue
+            if fold_title(base_title) == fold_title(search_text):
+                priority = ['', 'Roman', 'Heftroman'].index(variant) if variant in ['', 'Roman', 'Heftroman'] else 3
+                exact.append((priority, rank, book_key, book_values))
+        if not exact:
+            return None
+        priority, rank, book_key, book_values = min(exact)
+        return book_key, book_values
 
-    def get_raw_metadata_from_title(self, title, authors_str, browser, timeout, log, loglevel):
+    def authors_match(self, authors_str, soup):
+        """
+        True, if no author is given or one of the names of authors_str is in the overview of the book page.
+        """
+        names = [name for name in re.split(r'[\s,&;.]+', authors_str or '') if len(name) > 2
+                 and name.casefold() not in ('unknown', 'unbekannt')]
+        if not names:
+            return True
+        overview = soup.find('div', class_='perrypedia_std_rframe') or soup.find(id='mw-content-text') or soup
+        text = overview.get_text(' ').casefold()
+        return any(name.casefold() in text for name in names)
+
+    def get_raw_metadata_from_title(self, title, authors_str, browser, timeout, log, loglevel, abort=None):
+        """
+        Title search. Yields (book_key, book_values, soup, rank) for every candidate that is a book page, as soon as
+        it is downloaded and parsed, so the caller can put its result in the queue while the other candidates are
+        still downloading. rank is the position of the candidate by the similarity of its title with the search text
+        (0 is the best match), independent of the download order.
+        """
 
         if loglevel in [self.loglevels['DEBUG']]:
             log.info('Enter get_raw_metadata_from_title()')
 
         search_texts = [title.strip(), authors_str.strip()]
         soup = None
-        soups = []
         urls = []
         soup_title = None
         overview_div = None
@@ -1886,128 +4102,37 @@ class Perrypedia(Source):
             if search_text == '':
                 break
 
-            # Find all pages with searchstring in title with mediawiki search
-            url = self.api_url + 'action=opensearch&namespace=0&search=' \
-                  + search_text + '&limit=100&profile=normal-subphrases&format=json'
-            # https://www.perrypedia.de/mediawiki/api.php?action=opensearch&namespace=0&search=Das Erbe der Yulocs&limit=10&format=json
-            # url encoding is doing by the browser object:
-            # https://www.perrypedia.de/mediawiki/api.php?action=opensearch&namespace=0&search=Das%20Erbe%20der%20Yulocs&limit=10&format=json
-            # url = search_base_url + urllib.parse.quote(search_text) + '&title=Spezial%3ASuche'
-            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                log.info(_('API search with: "{0}"...').format(search_text))
-                log.info(_('GET url: "{0}"').format(url))
-            response = browser.open_novisit(url, timeout=timeout)
-            response_text = response.read().strip()
-            response_list = json.loads(response_text)
-            if loglevel in [self.loglevels['DEBUG']]:
-                log.info('response_list=', response_list)
-            # Search response for book pages.
-            # ['Ordoban',
-            #     ['Ordoban', 'Ordoban (Begriffsklärung)', 'Ordoban (Hörbuch)', 'Ordoban (Roman)', 'Ordoban (Silberband)'],
-            #     ['', '', '', '', ''],
-            #     ['https://www.perrypedia.de/wiki/Ordoban', 'https://www.perrypedia.de/wiki/Ordoban_(Begriffskl%C3%A4rung)', 'https://www.perrypedia.de/wiki/Ordoban_(H%C3%B6rbuch)', 'https://www.perrypedia.de/wiki/Ordoban_(Roman)', 'https://www.perrypedia.de/wiki/Ordoban_(Silberband)']
-            # ]
-            # <div class="mw-parser-output"><p>Der Begriff <b>Ordoban</b> wird mehrfach verwendet:
-            # <ul><li>für <i>die Person</i>, siehe: <b><a href="/wiki/Ordoban" title="Ordoban">Ordoban</a></b></li></ul>
-            # <ul><li>für <i>den <a href="/wiki/Perry_Rhodan-Heftromane" title="Perry Rhodan-Heftromane">Heftroman</a></i>, siehe: <b><a href="/wiki/Quelle:PR1200" class="mw-redirect" title="Quelle:PR1200">ORDOBAN (Roman)</a></b></li>
-            # <li>für <i>das <a href="/wiki/H%C3%B6rbuch" class="mw-redirect" title="Hörbuch">Hörbuch</a></i>, siehe: <b><a href="/wiki/Quelle:SE143" class="mw-redirect" title="Quelle:SE143">Ordoban (Hörbuch)</a></b></li>
-            # <li>für <i>den <a href="/wiki/Silberband" class="mw-redirect" title="Silberband">Silberband</a></i>, siehe: <b><a href="/wiki/Quelle:PRHC143" class="mw-redirect" title="Quelle:PRHC143">Ordoban (Silberband)</a></b></li></ul>
-            #
-            # ['Die Dritte Macht',
-            #     ['Die dritte Macht', 'Die Dritte Macht (Begriffsklärung)', 'Die dritte Macht (Comic)', 'Die Dritte Macht (Handlungsebenen)'],
-            #     ['', '', '', ''],
-            #     ['https://www.perrypedia.de/wiki/Die_dritte_Macht', 'https://www.perrypedia.de/wiki/Die_Dritte_Macht_(Begriffskl%C3%A4rung)', 'https://www.perrypedia.de/wiki/Die_dritte_Macht_(Comic)', 'https://www.perrypedia.de/wiki/Die_Dritte_Macht_(Handlungsebenen)']
-            # ]
-            # ['Perry Rhodan Chronik',
-            #     ['Perry Rhodan Chronik'],
-            #     [''],
-            #     ['https://www.perrypedia.de/wiki/Perry_Rhodan_Chronik']
-            # ]
-            # ['Das Erbe der Yulocs',
-            #     ['Das Erbe der Yulocs', 'Das Erbe der Yulocs (Begriffsklärung)', 'Das Erbe der Yulocs (Hörbuch)', 'Das Erbe der Yulocs (Silberband)'],
-            #     ['', '', '', ''],
-            #     ['https://www.perrypedia.de/wiki/Das_Erbe_der_Yulocs', 'https://www.perrypedia.de/wiki/Das_Erbe_der_Yulocs_(Begriffskl%C3%A4rung)', 'https://www.perrypedia.de/wiki/Das_Erbe_der_Yulocs_(H%C3%B6rbuch)', 'https://www.perrypedia.de/wiki/Das_Erbe_der_Yulocs_(Silberband)']
-            # ]
-            # Search with substring
-            # https://www.perrypedia.de/mediawiki/api.php?action=opensearch&namespace=0&search=Gucky&limit=10&format=json
-            # ["Gucky",
-            # ["Gucky","Gucky (Begriffsklärung)","Gucky (PR Neo)","Gucky (Urucher)","Gucky auf AIKKAUD","Gucky II","Gucky kehrt zurück","Gucky und das Zeitraumschiff","Gucky und das Zeitraumschiff / Die Schwarze Macht","Gucky und der Golem"],
-            # ["","","","","","","","","",""],
-            # ["https://www.perrypedia.de/wiki/Gucky","https://www.perrypedia.de/wiki/Gucky_(Begriffskl%C3%A4rung)","https://www.perrypedia.de/wiki/Gucky_(PR_Neo)","https://www.perrypedia.de/wiki/Gucky_(Urucher)","https://www.perrypedia.de/wiki/Gucky_auf_AIKKAUD","https://www.perrypedia.de/wiki/Gucky_II","https://www.perrypedia.de/wiki/Gucky_kehrt_zur%C3%BCck","https://www.perrypedia.de/wiki/Gucky_und_das_Zeitraumschiff","https://www.perrypedia.de/wiki/Gucky_und_das_Zeitraumschiff_/_Die_Schwarze_Macht","https://www.perrypedia.de/wiki/Gucky_und_der_Golem"]]
-            # ]
-            # https://www.perrypedia.de/wiki/Gucky_(Begriffskl%C3%A4rung)
-            # <div class="mw-parser-output"><p>Der Begriff <b>Gucky</b> wird mehrfach verwendet:
-            # <ul><li>für <i>den <a href="/wiki/Mausbiber" class="mw-redirect" title="Mausbiber">Mausbiber</a></i>, siehe: <b><a href="/wiki/Gucky" title="Gucky">Gucky</a></b></li>
-            # <li>für <i>den <a href="/wiki/Urucher" title="Urucher">Urucher</a></i>, siehe: <b><a href="/wiki/Gucky_(Urucher)" class="mw-redirect" title="Gucky (Urucher)">Gucky (Urucher)</a></b></li></ul>
-            # <p>Ähnliche Begriffe:
-            # <ul><li>für <i>Guckys negatives Spiegelbild im <a href="/wiki/Anti-Universum" title="Anti-Universum">Anti-Universum</a></i>, siehe: <b><a href="/wiki/Gucky_II" title="Gucky II">Gucky&nbsp;II</a></b></li>
-            # <li>für <i>den <a href="/wiki/Planet" title="Planet">Planeten</a> in <a href="/wiki/M_82" class="mw-redirect" title="M 82">M&nbsp;82</a></i>, siehe: <b><a href="/wiki/Gucklon" class="mw-redirect" title="Gucklon">Gucklon</a></b></li>
-            # <li>für <i>die eidechsenartigen Tiere</i>, siehe: <b><a href="/wiki/Gucky-Olm" title="Gucky-Olm">Gucky-Olm</a></b></li>
-            # <li>für <i>den einzigen <a href="/wiki/Mond" title="Mond">Mond</a> des <a href="/wiki/Planet" title="Planet">Planeten</a> <a href="/wiki/Vurga" title="Vurga">Vurga</a></i>, siehe: <b><a href="/wiki/Guckys_Home" title="Guckys Home">Guckys Home</a></b></li>
-            # <li>für <i>den fünften <a href="/wiki/Planet" title="Planet">Planeten</a> der <a href="/wiki/Sonne" class="mw-redirect" title="Sonne">Sonne</a> <a href="/wiki/Drink" title="Drink">Drink</a></i>, siehe: <b><a href="/wiki/Guckys_Inn" title="Guckys Inn">Guckys Inn</a></b></li>
-            # <li>für <i>den <a href="/wiki/Planet" title="Planet">Planeten</a> in der <a href="/wiki/Galaxie" title="Galaxie">Galaxie</a> <a href="/wiki/Karo-1001" class="mw-redirect" title="Karo-1001">Karo-1001</a></i>, siehe: <b><a href="/mediawiki/index.php?title=Guckys_Rast&amp;action=edit&amp;redlink=1" class="new" title="Guckys Rast (Seite nicht vorhanden)">Guckys Rast</a></b></li>
-            # <li>für <i>die <a href="/wiki/Mikrobuch" title="Mikrobuch">Mikrobuch</a>-Serie</i>, siehe: <b>»<a href="/wiki/Gucky,_der_Retter_des_Universums" title="Gucky, der Retter des Universums">Gucky, der Retter des Universums</a>«</b></li>
-            # <li>für <i>die <a href="/wiki/Trivideo" title="Trivideo">Trivideo</a>-Sitcom</i>, siehe: <b>»<a href="/wiki/Guckys_Abenteuer_auf_der_Gem%C3%BCse-Ranch" class="mw-redirect" title="Guckys Abenteuer auf der Gemüse-Ranch">Guckys Abenteuer auf der Gemüse-Ranch</a>«</b></li>
-            # <li>für <i>das Stoff-Kuscheltier</i>, siehe: <b><a href="/wiki/Pl%C3%BCsch-Gucky" title="Plüsch-Gucky">Plüsch-Gucky</a></b></li></ul>
-            # <p><br>
-            # </p>
-            # <hr>
-            # <div style="border:1px solid #fff; padding:3px !important; background-color: #fff; overflow:hidden; clear:right; float:right; border-width:.3em 0 .3em 1.4em;"><div style="text-align:left;font-size:80%"><a href="/wiki/Datei:PRNeo_Schriftzug.jpg" class="image"><img alt="PRNeo Schriftzug.jpg" src="/mediawiki/images/thumb/3/36/PRNeo_Schriftzug.jpg/100px-PRNeo_Schriftzug.jpg" decoding="async" width="100" height="33" srcset="/mediawiki/images/thumb/3/36/PRNeo_Schriftzug.jpg/150px-PRNeo_Schriftzug.jpg 1.5x, /mediawiki/images/3/36/PRNeo_Schriftzug.jpg 2x"></a><br></div></div>
-            # <ul><li>für <i>den <a href="/wiki/Mausbiber_(PR_Neo)" class="mw-redirect" title="Mausbiber (PR Neo)">Mausbiber</a></i>, siehe: <b><a href="/wiki/Gucky_(PR_Neo)" title="Gucky (PR Neo)">Gucky (PR Neo)</a></b></li></ul>
-            # </div>
-
-            title_list = list(response_list[1])
-            titles = '\t'.join(title_list)
-            url_list = list(response_list[3])
-            if loglevel in [self.loglevels['DEBUG']]:
-                log.info('title_list=', title_list)
-                log.info('url_list=', url_list)
+            # Look up the title in the local title index first: all hits are book pages, no search needed
+            index = self.title_index(log)
+            entries = index.find_title(search_text) if index is not None else []
+            if not entries:
+                # Messy titles (file names, other dashes, transliterated umlauts): fuzzy match over all titles
+                matcher = self.title_matcher(log)
+                matches = matcher.search(search_text, min_score=self.fuzzy_title_min_score) if matcher else []
+                if loglevel in [self.loglevels['DEBUG']]:
+                    log.info('Fuzzy title matches:', matches)
+                entries = [{'ppid': ppid, 'title': page_title} for ppid, score, page_title in matches]
+            if entries:
+                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                    log.info(_('{0} book(s) found in the title index.').format(len(entries)))
+                for entry in entries:
+                    # The titles in the index are the targets of the "Quelle:" redirects
+                    self.remember_redirect('Quelle:' + entry['ppid'], entry['title'], log)
+                    books[entry['title']] = [entry['ppid'], self.book_page_url(entry['ppid'])]
+                title_list = []
+                url_list = []
+                titles = ''
+            else:
+                title_list, url_list, titles = self.search_titles(search_text, browser, timeout, log, loglevel)
 
             # If 'Begriffsklärung' in response list, get the Begriffsklärung page and extract the source links
             # (contains series_code and issuenumber!)
             if '(Begriffsklärung)' in titles:
-                ambigouus_title, ambigouus_url = zip(
-                    *((t, u) for t, u in zip(title_list, url_list) if '(Begriffsklärung)' in t))
-                if loglevel in [self.loglevels['DEBUG']]:
-                    log.info('Ambigouus hint (Begriffsklärung) in wiki response found: {0}. Going to fetch that page'
-                             .format(ambigouus_url))
-                # Go to disambiguous page
-                page = browser.open_novisit(ambigouus_url[0], timeout=timeout).read().strip()
-                soup = BeautifulSoup(page, 'html.parser')
-                # Check page for book links and put books in title list and url list
-                redirects = soup.select_one('html body #content #bodyContent #mw-content-text .mw-parser-output ul')
-                # <ul>
-                # <li>für <i>den <a href="/wiki/Perry_Rhodan-Heftromane" title="Perry Rhodan-Heftromane">Heftroman</a></i>, siehe: <b><a href="/wiki/Quelle:PR630" class="mw-redirect" title="Quelle:PR630">Das Erbe der Yulocs</a></b></li>
-                # <li>für <i>das <a href="/wiki/H%C3%B6rbuch" class="mw-redirect" title="Hörbuch">Hörbuch</a></i>, siehe: <b><a href="/wiki/Quelle:SE71" class="mw-redirect" title="Quelle:SE71">Das Erbe der Yulocs (Hörbuch)</a></b></li>
-                # <li>für <i>den <a href="/wiki/Silberband" class="mw-redirect" title="Silberband">Silberband</a></i>, siehe: <b><a href="/wiki/Quelle:PRHC71" class="mw-redirect" title="Quelle:PRHC71">Das Erbe der Yulocs (Silberband)</a></b></li>
-                # </ul>
-                for redirect in redirects.find_all('li'):
-                    # If there's a book link, it is the second link, so ignore other <li> line types
-                    try:
-                        if loglevel in [self.loglevels['DEBUG']]:
-                            log.info('redirect={0}'.format(str(redirect)))
-                        book_type_link = redirect.find_all('a', href=True)[0]
-                        book_type = book_type_link.get('title')
-                        link = redirect.find_all('a', href=True)[1]
-                        text = redirect.find_all('a')[1].contents[0]
-                        title = link.get('title')
-                        href = link.get('href')
-                        if loglevel in [self.loglevels['DEBUG']]:
-                            log.info('text=', text)
-                            log.info('title=', title)
-                            log.info('href=', href)
-                        # Check if redirect indicate a book page
-                        if book_type in self.book_variants:
-                            if loglevel in [self.loglevels['DEBUG']]:
-                                log.info('Valid book type found: ', book_type)
-                            # Get ppid from title (series_code and issuenumber)
-                            ppid = title.replace('Quelle:', '')
-                            if 'https://' in href:
-                                books[text] = [ppid, href]
-                            else:
-                                books[text] = [ppid, self.base_url + href]
-                    except:
-                        continue
+                for ambigouus_title in [t for t in title_list if '(Begriffsklärung)' in t]:
+                    if loglevel in [self.loglevels['DEBUG']]:
+                        log.info('Ambigouus hint (Begriffsklärung) in wiki response found: {0}. Resolving its links'
+                                 .format(ambigouus_title))
+                    books.update(self.resolve_disambiguation(ambigouus_title, browser, timeout, log, loglevel))
 
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('books=', books)
@@ -2045,6 +4170,10 @@ class Perrypedia(Source):
             title_list = title_list_new
             url_list = url_list_new
 
+            # Ask the API, which of the remaining hits are book pages, before downloading them
+            if title_list:
+                title_list, url_list = self.filter_book_pages(title_list, url_list, browser, timeout, log, loglevel)
+
             if loglevel in [self.loglevels['DEBUG']]:
                 log.info('title_list=', title_list)
                 log.info('url_list=', url_list)
@@ -2075,26 +4204,68 @@ class Perrypedia(Source):
             if books:
                 if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
                     log.info(_('{0} potential book source(s) found.'.format(len(books))))
-                for book_key, book_values in sorted(books.items()):
-                    # {
-                    # 'Das Erbe der Yulocs': ['PR630', 'https://www.perrypedia.de/wiki/Quelle:PR630'],
-                    # 'Das Erbe der Yulocs (Hörbuch)': ['SE71', 'https://www.perrypedia.de/wiki/Quelle:SE71'],
-                    # 'Das Erbe der Yulocs (Silberband)': ['PRHC71', 'https://www.perrypedia.de/wiki/Quelle:PRHC71']
-                    # }
-                    if loglevel in [self.loglevels['DEBUG']]:
-                        log.info('book_key=', book_key)
-                        log.info('book_values=', book_values)
-                    page = browser.open_novisit(book_values[1], timeout=timeout).read().strip()
-                    soup = BeautifulSoup(page, 'html.parser')
-                    if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                        log.info(_('Page title:'), soup.title.string)
-                    if 'Hörbuch' in book_key or '(' not in book_key:
-                        overview_div = soup.find('div', {'id': 'mw-content-text'})
-                    else:
-                        overview_div = soup.find('div', {'class': 'perrypedia_std_rframe overview'})
-                    if overview_div is not None:
+                # Download and parse the candidate pages in parallel. Every book page is passed on as soon as it is
+                # downloaded, with its rank by the similarity of its title with the search text
+                candidates = sorted(books.items(), key=lambda book: (
+                    -TitleMatcher.similarity(search_text, book[0]), book[0]))
+                ranks = {book_key: rank for rank, (book_key, book_values) in enumerate(candidates)}
+                # A page with exactly the searched title (and author) is downloaded first and alone. If it is a book
+                # page, the other candidates are skipped (unless the user wants all of them).
+                confident = self.confident_candidate(search_text, candidates) \
+                    if not self.prefs['return_all_candidates'] else None
+                if confident is not None:
+                    book_key, book_values = confident
+                    candidates.remove(confident)
+                    try:
+                        soup = self.fetch_book_candidate(book_key, book_values, timeout, log, loglevel)
+                    except Exception:
+                        log.exception(_('Failed to get contents from url {0}.').format(book_values[1]))
+                        soup = None
+                    if soup is not None:
                         is_book_page = True
-                        soups.append(soup)
+                        # The other field is the author, if title and authors are not reversed
+                        other_text = authors_str if search_text == search_texts[0] else search_texts[0]
+                        if self.authors_match(other_text, soup):
+                            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                                log.info(_('Exact match {0}, {1} other candidate(s) not downloaded.')
+                                         .format(book_key, len(candidates)))
+                            candidates = []
+                        yield book_key, book_values, soup, ranks[book_key]
+                        soup = None
+                # {
+                # 'Das Erbe der Yulocs': ['PR630', 'https://www.perrypedia.de/wiki/Quelle:PR630'],
+                # 'Das Erbe der Yulocs (Hörbuch)': ['SE71', 'https://www.perrypedia.de/wiki/Quelle:SE71'],
+                # 'Das Erbe der Yulocs (Silberband)': ['PRHC71', 'https://www.perrypedia.de/wiki/Quelle:PRHC71']
+                # }
+                executor = ThreadPoolExecutor(max_workers=max(1, int(self.prefs['max_concurrent_requests'])))
+                futures = {}
+                try:
+                    futures = {executor.submit(self.fetch_book_candidate, book_key, book_values, timeout, log, loglevel):
+                               (book_key, book_values) for book_key, book_values in candidates}
+                    try:
+                        for future in self.completed_futures(futures, timeout, abort):
+                            book_key, book_values = futures[future]
+                            if loglevel in [self.loglevels['DEBUG']]:
+                                log.info('book_key=', book_key)
+                                log.info('book_values=', book_values)
+                            try:
+                                soup = future.result()
+                            except Exception:
+                                log.exception(_('Failed to get contents from url {0}.').format(book_values[1]))
+                                continue
+                            if soup is not None:
+                                is_book_page = True
+                                yield book_key, book_values, soup, ranks[book_key]
+                                soup = None  # the caller has parsed it
+                    except FutureTimeoutError:
+                        log.error(_('Title search: not all pages downloaded within {0} seconds.').format(timeout))
+                    if abort is not None and abort.is_set():
+                        log.info(_('Title search aborted.'))
+                finally:
+                    # Pages not started yet are not downloaded any more (shutdown(cancel_futures=True) needs Python 3.9)
+                    for future in futures:
+                        future.cancel()
+                    executor.shutdown(wait=False)
             else:
                 if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
                     log.info(_('No possible book source found with'), search_text)
@@ -2102,11 +4273,130 @@ class Perrypedia(Source):
             if is_book_page:
                 break  # No search with authors field
 
-        if is_book_page:
-            return books, soups
-        else:
+        if not is_book_page:
             log.exception(_('Failed to download book metadata with title search. Giving up.'))
-            return {}, []
+
+    def parse_cover_page(self, page, file_div_class, log, loglevel):
+        """
+        Get the url(s) of the original image from a cover file page (/wiki/Datei:...).
+        """
+        # <div class="fullImageLink" id="file">
+        # <a href="/mediawiki/images/7/78/A500_1.JPG">
+        # <img alt="Datei:A500 1.JPG" height="510" src="/mediawiki/images/7/78/A500_1.JPG" width="704"/></a>
+        # <div class="mw-filepage-resolutioninfo">Es ist keine höhere Auflösung vorhanden.</div></div>
+        cover_urls = []
+        soup = parse_html(page, 'cover')
+        for div_tag in soup.find_all('div', class_=file_div_class):  # , id_='file'
+            if file_div_class == 'fullMedia':
+                a_tags = div_tag.find_all('a', class_='internal', href=True)
+            else:
+                a_tags = div_tag.find_all('a', href=True)
+            for a_tag in a_tags:
+                url = a_tag.attrs.get("href")
+                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                    log.info(_('Relative cover url:'), url)
+                cover_urls.append(self.base_url + url)  # <a href="/mediawiki/images/8/ 8d/A024_1.JPG">
+        return cover_urls
+
+    def fetch_cover_pages(self, cover_page_hrefs, timeout, log, loglevel):
+        """
+        Download the cover file pages linked in a book page.
+        A book can have many covers (Stellaris packets have ten or more), so the file pages are downloaded in
+        parallel. The pages are returned in the order of the links (None for a failed download).
+        """
+        cover_page_urls = [self.base_url + href for href in cover_page_hrefs]
+        if not cover_page_urls:
+            return []
+
+        def fetch_cover_page(cover_page_url):
+            try:
+                return self.fetch_url(self.browser, cover_page_url, timeout, log, loglevel).strip()
+            except Exception:
+                log.exception(_('Failed to get cover page from url {0}.').format(cover_page_url))
+                return None
+
+        if len(cover_page_urls) == 1:
+            return [fetch_cover_page(cover_page_urls[0])]
+        workers = min(len(cover_page_urls), max(1, int(self.prefs['max_concurrent_requests'])))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fetch_cover_page, cover_page_urls))
+
+    def resolve_cover_pages(self, cover_page_hrefs, file_div_class, browser, timeout, log, loglevel):
+        """
+        Get the urls of the original cover images by parsing the cover file pages linked in a book page.
+        The order of the covers is kept (the first one is the original cover in most cases).
+        """
+        for href in cover_page_hrefs:
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('Found a relative cover page URL:'), href)  # /wiki/Datei:A500_1.JPG
+        cover_urls = []
+        for page in self.fetch_cover_pages(cover_page_hrefs, timeout, log, loglevel):
+            if page:
+                cover_urls.extend(self.parse_cover_page(page, file_div_class, log, loglevel))
+        return cover_urls
+
+    def resolve_cover_urls(self, cover_page_hrefs, file_div_class, browser, timeout, log, loglevel):
+        """
+        Get the urls of the original cover images for the cover file pages linked in a book page.
+        All file names are resolved with one MediaWiki imageinfo query (up to 50 files per request).
+        Files not resolved by the API are resolved by parsing their file pages.
+        """
+        # https://www.perrypedia.de/mediawiki/api.php?action=query&prop=imageinfo&iiprop=url|size&format=json
+        # &titles=Datei:PR3088.jpg|Datei:A500_1.JPG
+        # {"query": {"normalized": [{"from": "Datei:A500_1.JPG", "to": "Datei:A500 1.JPG"}],
+        #  "pages": {"12345": {"ns": 6, "title": "Datei:A500 1.JPG", "imagerepository": "local",
+        #  "imageinfo": [{"size": 123456, "width": 704, "height": 510,
+        #  "url": "https://www.perrypedia.de/mediawiki/images/7/78/A500_1.JPG", ...}]}}}}
+        file_titles = []
+        for href in cover_page_hrefs:
+            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                log.info(_('Found a relative cover page URL:'), href)  # /wiki/Datei:A500_1.JPG
+            file_titles.append(unquote(href.split('/wiki/', 1)[-1]).replace('_', ' '))
+        if not file_titles:
+            return []
+
+        image_urls = {}
+        for start in range(0, len(file_titles), 50):
+            batch = file_titles[start:start + 50]
+            url = self.api_url + urlencode({'action': 'query', 'prop': 'imageinfo', 'iiprop': 'url|size',
+                                            'format': 'json', 'titles': '|'.join(batch)})
+            if loglevel in [self.loglevels['DEBUG']]:
+                log.info('url=', url)
+            try:
+                response = json.loads(self.fetch_url(browser, url, timeout, log, loglevel).strip())
+            except Exception:
+                log.exception(_('Failed to get cover urls from url {0}.').format(url))
+                continue
+            query = response.get('query', {})
+            normalized = {entry['to']: entry['from'] for entry in query.get('normalized', [])}
+            for page in query.get('pages', {}).values():
+                imageinfo = page.get('imageinfo')
+                if not imageinfo or not imageinfo[0].get('url'):
+                    continue
+                image_url = imageinfo[0]['url']
+                if image_url.startswith('//'):
+                    image_url = 'https:' + image_url
+                elif image_url.startswith('/'):
+                    image_url = self.base_url + image_url
+                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+                    log.info(_('Cover url:'), image_url, '({0} x {1}, {2} bytes)'.format(
+                        imageinfo[0].get('width'), imageinfo[0].get('height'), imageinfo[0].get('size')))
+                image_urls[page['title']] = image_url
+                if page['title'] in normalized:
+                    image_urls[normalized[page['title']]] = image_url
+
+        # Fallback: parse the file pages not resolved by the API
+        unresolved = [href for href, file_title in zip(cover_page_hrefs, file_titles) if file_title not in image_urls]
+        if unresolved and loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
+            log.info(_('Cover urls not found with the API, parsing the cover pages:'), unresolved)
+        pages = dict(zip(unresolved, self.fetch_cover_pages(unresolved, timeout, log, loglevel)))
+        cover_urls = []
+        for href, file_title in zip(cover_page_hrefs, file_titles):
+            if file_title in image_urls:
+                cover_urls.append(image_urls[file_title])
+            elif pages.get(href):
+                cover_urls.extend(self.parse_cover_page(pages[href], file_div_class, log, loglevel))
+        return cover_urls
 
     def parse_pp_book_page(self, soup, browser, timeout, source_url, log, loglevel):
 
@@ -2116,8 +4406,7 @@ class Perrypedia(Source):
         # Cchecking first for a standard book page (Heftserie etc.)
 
         # Selector for standard book pages
-        overview_selector = 'html body #content #bodyContent #mw-content-text .mw-parser-output ' \
-                            '.perrypedia_std_rframe.overview table tbody'
+        overview_selector = '#mw-content-text .mw-parser-output .perrypedia_std_rframe.overview table tbody'
         table_body = soup.select_one(overview_selector)
 
         # ToDo: Handle other page structures
@@ -2141,10 +4430,10 @@ class Perrypedia(Source):
 
                 content = ''  # Inhalt
                 # <h2>id="Inhalt"<p>
-                content_header = soup.find('span', {'id': 'Inhalt'})
+                content_header = soup.find(id='Inhalt')
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('content_header=', content_header)
-                for tag in soup.h2.find_next_siblings(name=['p', 'dl']):
+                for tag in section_tags(soup, 'Inhalt' if content_header is not None else None):
                     content = content + tag.text + '<br />'  # ToDo: config user choice text or html
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('content (abbr.)=', content[:200])
@@ -2152,7 +4441,7 @@ class Perrypedia(Source):
                 overview = {}  # Titles
                 overview_data = []
                 # Die Titel
-                table_selector = 'html body #content #bodyContent #mw-content-text .mw-parser-output table tbody'
+                table_selector = '#mw-content-text .mw-parser-output table tbody'
                 table_body = soup.select_one(table_selector)
                 rows = table_body.find_all('tr')
                 for row in rows:
@@ -2165,25 +4454,11 @@ class Perrypedia(Source):
                     if len(row) > 1:
                         overview[row[0]] = ' | ' + row[1] + ' | ' + row[2] + ' | ' + row[3] + ' | ' + row[4]
 
-                cover_urls = []
                 cover_selector = '#mw-content-text > div.mw-parser-output > div:nth-child(3)'
                 cover_body = soup.select_one(cover_selector)
-                for url in cover_body.find_all('a', class_="image"):
-                    if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                        log.info(_('Found a relative cover page URL:'), url['href'])  # /wiki/Datei:A500_1.JPG
-                    cover_page_url = self.base_url + url['href']
-                    page = browser.open_novisit(cover_page_url, timeout=timeout).read().strip()
-                    if page is not None:
-                        soup = BeautifulSoup(page, 'html.parser')
-                        cover_url = ''
-                        # ToDo: Error handling
-                        # for div_tag in soup.find_all('div', class_='fullMedia'):  # , id_='file'
-                        for div_tag in soup.find_all('div', class_='fullImageLink'):  # , id_='file'
-                            for a_tag in div_tag.find_all('a', href=True):
-                                url = a_tag.attrs.get("href")
-                                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                                    log.info(_('Relative cover url:'), url)
-                                cover_urls.append(self.base_url + url)  # <a href="/mediawiki/images/8/ 8d/A024_1.JPG">
+                cover_urls = self.resolve_cover_urls(
+                    [url['href'] for url in cover_body.find_all('a', class_="image")], 'fullImageLink',
+                    browser, timeout, log, loglevel)
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('cover_urls=', cover_urls)
 
@@ -2208,25 +4483,11 @@ class Perrypedia(Source):
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('content_html[:10]={0}'.format(content_html[:10]))
 
-                cover_urls = []
                 cover_selector = '#mw-content-text > div.mw-parser-output > div:nth-child(2)'
                 cover_body = soup.select_one(cover_selector)
-                for url in cover_body.find_all('a', class_="image"):
-                    if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                        log.info(_('Found a relative cover page URL:'), url['href'])  # /wiki/Datei:A500_1.JPG
-                    cover_page_url = self.base_url + url['href']
-                    page = browser.open_novisit(cover_page_url, timeout=timeout).read().strip()
-                    if page is not None:
-                        soup = BeautifulSoup(page, 'html.parser')
-                        cover_url = ''
-                        # ToDo: Error handling
-                        # for div_tag in soup.find_all('div', class_='fullMedia'):  # , id_='file'
-                        for div_tag in soup.find_all('div', class_='fullImageLink'):  # , id_='file'
-                            for a_tag in div_tag.find_all('a', href=True):
-                                url = a_tag.attrs.get("href")
-                                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                                    log.info(_('Relative cover url:'), url)
-                                cover_urls.append(self.base_url + url)  # <a href="/mediawiki/images/8/ 8d/A024_1.JPG">
+                cover_urls = self.resolve_cover_urls(
+                    [url['href'] for url in cover_body.find_all('a', class_="image")], 'fullImageLink',
+                    browser, timeout, log, loglevel)
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('cover_urls=', cover_urls)
 
@@ -2252,25 +4513,11 @@ class Perrypedia(Source):
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('content_html[:10]={0}'.format(content_html[:10]))
 
-                cover_urls = []
                 cover_selector = '#mw-content-text > div.mw-parser-output > div:nth-child(2)'
                 cover_body = soup.select_one(cover_selector)
-                for url in cover_body.find_all('a', class_="image"):
-                    if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                        log.info(_('Found a relative cover page URL:'), url['href'])  # /wiki/Datei:A500_1.JPG
-                    cover_page_url = self.base_url + url['href']
-                    page = browser.open_novisit(cover_page_url, timeout=timeout).read().strip()
-                    if page is not None:
-                        soup = BeautifulSoup(page, 'html.parser')
-                        cover_url = ''
-                        # ToDo: Error handling
-                        # for div_tag in soup.find_all('div', class_='fullMedia'):  # , id_='file'
-                        for div_tag in soup.find_all('div', class_='fullImageLink'):  # , id_='file'
-                            for a_tag in div_tag.find_all('a', href=True):
-                                url = a_tag.attrs.get("href")
-                                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                                    log.info(_('Relative cover url:'), url)
-                                cover_urls.append(self.base_url + url)  # <a href="/mediawiki/images/8/ 8d/A024_1.JPG">
+                cover_urls = self.resolve_cover_urls(
+                    [url['href'] for url in cover_body.find_all('a', class_="image")], 'fullImageLink',
+                    browser, timeout, log, loglevel)
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('cover_urls=', cover_urls)
 
@@ -2295,25 +4542,11 @@ class Perrypedia(Source):
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('content_html[:10]={0}'.format(content_html[:10]))
 
-                cover_urls = []
                 cover_selector = '#mw-content-text > div.mw-parser-output > div > div'
                 cover_body = soup.select_one(cover_selector)
-                for url in cover_body.find_all('a', class_="image"):
-                    if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                        log.info(_('Found a relative cover page URL:'), url['href'])  # /wiki/Datei:A500_1.JPG
-                    cover_page_url = self.base_url + url['href']
-                    page = browser.open_novisit(cover_page_url, timeout=timeout).read().strip()
-                    if page is not None:
-                        soup = BeautifulSoup(page, 'html.parser')
-                        cover_url = ''
-                        # ToDo: Error handling
-                        # for div_tag in soup.find_all('div', class_='fullMedia'):  # , id_='file'
-                        for div_tag in soup.find_all('div', class_='fullImageLink'):  # , id_='file'
-                            for a_tag in div_tag.find_all('a', href=True):
-                                url = a_tag.attrs.get("href")
-                                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                                    log.info(_('Relative cover url:'), url)
-                                cover_urls.append(self.base_url + url)  # <a href="/mediawiki/images/8/ 8d/A024_1.JPG">
+                cover_urls = self.resolve_cover_urls(
+                    [url['href'] for url in cover_body.find_all('a', class_="image")], 'fullImageLink',
+                    browser, timeout, log, loglevel)
                 if loglevel in [self.loglevels['DEBUG']]:
                     log.info('cover_urls=', cover_urls)
 
@@ -2408,11 +4641,11 @@ class Perrypedia(Source):
         # Find plot
 
         plot = ''  # Handlung
-        # <h2>id="Handlung"<p>
-        plot_header = soup.find('span', {'id': 'Handlung'})
+        # <h2>id="Handlung"<p>, only up to the next section
+        plot_header = soup.find(id='Handlung')
         if loglevel in [self.loglevels['DEBUG']]:
             log.info('plot_header=', plot_header)
-        for tag in soup.h2.find_next_siblings(name=['p', 'dl']):
+        for tag in section_tags(soup, 'Handlung' if plot_header is not None else None):
             plot = plot + tag.text + '<br />'  # ToDo: config user choice text or html
             # plot = plot + str(tag.decode(formatter="html5"))  # ToDo: config user choice text or html
             # Note: The HTML formatter produces '<pre>' for '<dl>'
@@ -2434,41 +4667,11 @@ class Perrypedia(Source):
         # srcset="/mediawiki/images/thumb/7/78/A500_1.JPG/540px-A500_1.JPG 1.5x, /mediawiki/images/7/78/A500_1.JPG 2x"></a>
         # https://www.perrypedia.de/wiki/Datei:PR3088.jpg
         # https://www.perrypedia.de/wiki/Datei:A500_1.JPG
-        cover_urls = []
-        for url in table_body.find_all('a', class_="image"):
-            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                log.info(_('Found a relative cover page URL:'), url['href'])  # /wiki/Datei:A500_1.JPG
-            cover_page_url = self.base_url + url['href']
-
-            # #mw-content-text > div.mw-parser-output > div.perrypedia_std_rframe.overview > table > tbody >
-            # tr:nth-child(2) > td > div:nth-child(2) > div > div:nth-child(2) > div > div > a
-            # <a href="/wiki/Datei:A500_1.JPG" class="image"><img alt="A500 1.JPG"
-            # src="/mediawiki/images/thumb/7/78/A500_1.JPG/360px-A500_1.JPG" width="360" height="261"
-            # srcset="/mediawiki/images/thumb/7/78/A500_1.JPG/540px-A500_1.JPG 1.5x, /mediawiki/images/7/78/A500_1.JPG 2x"></a>
-            # https://www.perrypedia.de/wiki/Datei:PR3088.jpg
-            # https://www.perrypedia.de/wiki/Datei:A500_1.JPG
-
-            # url = 'https://www.perrypedia.de/mediawiki/images/d/d1/PR2038.jpg'  # Funktioniert!!!!!
-            # url = self.cover_path
-            # url ist die Adresse der Seite mit dem Cover. Das  Coverbild hat dann die Adresse:
-            # https://www.perrypedia.de/mediawiki/images/8/8d/A024_1.JPG
-            # Also Bildseite parsen:
-            page = browser.open_novisit(cover_page_url, timeout=timeout).read().strip()
-            if page is not None:
-                soup = BeautifulSoup(page, 'html.parser')
-                # <div class="fullImageLink" id="file">
-                # <a href="/mediawiki/images/7/78/A500_1.JPG">
-                # <img alt="Datei:A500 1.JPG" height="510" src="/mediawiki/images/7/78/A500_1.JPG" width="704"/></a>
-                # <div class="mw-filepage-resolutioninfo">Es ist keine höhere Auflösung vorhanden.</div></div>
-                cover_url = ''
-                # ToDo: Error handling
-                for div_tag in soup.find_all('div', class_='fullMedia'):  # , id_='file'
-                    for a_tag in div_tag.find_all('a', class_='internal', href=True):
-                        url = a_tag.attrs.get("href")
-                        if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                            log.info(_('Relative cover url:'), url)
-                        # cover_urls.append(base_url + url['href'])  # <a href="/mediawiki/images/8/ 8d/A024_1.JPG">
-                        cover_urls.append(self.base_url + url)  # <a href="/mediawiki/images/8/ 8d/A024_1.JPG">
+        # url ist die Adresse der Seite mit dem Cover. Das  Coverbild hat dann die Adresse:
+        # https://www.perrypedia.de/mediawiki/images/8/8d/A024_1.JPG
+        # Also Bildseiten parsen (alle Bildseiten eines Buchs parallel):
+        cover_urls = self.resolve_cover_urls([url['href'] for url in table_body.find_all('a', class_="image")],
+                                             'fullMedia', browser, timeout, log, loglevel)
 
         if loglevel in [self.loglevels['DEBUG']]:
             log.info('cover_urls=', cover_urls)
@@ -2476,8 +4679,10 @@ class Perrypedia(Source):
         # ToDo: Perhaps try also plot_summary and other sections (not present in all book pages)
         return overview, plot, cover_urls, source_url
 
-    def parse_raw_metadata(self, raw_metadata, series_names, log, loglevel):
+    def parse_raw_metadata(self, raw_metadata, series_names, log, loglevel, ppid=None):
         # Parse metadata source and put metadata in result queue
+        # The source url may be the canonical book page instead of the "Quelle:" redirect, so special pages are
+        # recognized by their ppid (series code and issuenumber), not by the url.
 
         if loglevel in [self.loglevels['DEBUG']]:
             log.info('Enter parse_raw_metadata()')
@@ -2493,12 +4698,16 @@ class Perrypedia(Source):
             log.info('cover_urls=', cover_urls)
             log.info('url=', url)
 
+        if ppid is None:
+            # url = https://www.perrypedia.de/mediawiki/index.php?title=Quelle:STEBP1
+            page_title = page_title_from_url(url) or ''
+            ppid = page_title[7:] if page_title.startswith('Quelle:') else ''
+
         # Overview data for not standard pages
 
-        # url = https://www.perrypedia.de/mediawiki/index.php?title=Quelle:STEBP1
-        if 'Quelle:STEBP' in url:
+        if re.match(r'^STEBP\d+$', ppid):
             series_code = 'STEBP'
-            issuenumber = url.split('Quelle:STEBP')[1]
+            issuenumber = ppid[5:]
             title = series_names[series_code][:-1] + " " + str(issuenumber).strip()  # Stellaris E-Book Paket 1
             authors = []
             # Create Metadata instance
@@ -2711,7 +4920,7 @@ class Perrypedia(Source):
         if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
             log.info(_('Trying to get series code and issuenumber from result.'))
         try:
-            series_code = get_key(series_names, overview['Serie:'], exact=False)
+            series_code = self.series_name_index.find(overview['Serie:'])
             issuenumber = int(str(re.search(r'\d+', overview['Serie:']).group()).strip())
             if loglevel in [self.loglevels['DEBUG']]:
                 log.info("series_code=", series_code)
@@ -2841,11 +5050,19 @@ class Perrypedia(Source):
             if loglevel in [self.loglevels['DEBUG']]:
                 log.info('#subseries=', str(overview['Zyklus:']))
             subseries = str(overview['Zyklus:'])
-            subseries_index = 0.0  # ToDo: Aus Übersichtsseite Zyklus ermitteln
+            first_issue = self.cycle_index.offset(series_code, subseries)
             # mi.set_user_metadata('#subseriese', str(overview['Zyklus:']))
         except KeyError:
-            subseries = None
-            subseries_index = None
+            # No cycle in the overview (e. g. from a stripped-down cache entry): take it from the cycle index. The
+            # overview is left as it is, it goes into the comments.
+            subseries, first_issue = self.cycle_index.cycle(series_code, issuenumber)
+            if loglevel in [self.loglevels['DEBUG']] and subseries is not None:
+                log.info('#subseries from cycle index=', subseries)
+        # Position of the issue in its cycle, from the first issue of the cycle
+        try:
+            subseries_index = float(int(issuenumber) - first_issue + 1)
+        except (TypeError, ValueError):
+            subseries_index = None if subseries is None else 0.0
 
         try:
             if loglevel in [self.loglevels['DEBUG']]:
@@ -3003,6 +5220,8 @@ class Perrypedia(Source):
             path = self.series_metadata_path['DEFAULT']
         mi.comments = mi.comments + '</p>'
         mi.comments = mi.comments + '<p>Handlung:<br />' + plot + '</p>'
+        for heading, text in self.get_extra_sections(url, self.browser, 30, log, loglevel):
+            mi.comments = mi.comments + '<p>' + heading + ':<br />' + text + '</p>'
         mi.comments = mi.comments + '<p>Quelle:' + '&nbsp;' + '<a href="' + url + '">' + url + '</a></p>'
         # mi.comments = self.sanitize_comments_html(mi.comments)
 
@@ -3089,13 +5308,12 @@ class Perrypedia(Source):
                         url = foreign_series[series_code][1]
                         # Get the foreign issue info.
                         # This is in some cases a three-step (overview -> cycles -> issues), depending on country/language
-                        page = self.browser.open_novisit(url, timeout=30).read().strip()
-                        if page:
+                        # The parsed page is shared with get_ppid_from_foreign_page() and concurrent identify threads
+                        soup = self.fetch_soup(self.browser, url, 30, log, loglevel, parts='table')
+                        if soup is not None:
                             if loglevel in [self.loglevels['DEBUG']]:
                                 log.info('Cycles page found.')
-                            soup = BeautifulSoup(page, 'html.parser')
-                            selector = 'html body #mw-content-text div.mw-parser-output table.perrypedia_std_table tbody'
-                            table_body = soup.select_one(selector)
+                            table_body = soup.select_one('table.perrypedia_std_table tbody')
                             # if loglevel in [self.loglevels['DEBUG']]:
                             #     log.info('table_body={0}'.format(table_body))
 
@@ -3138,11 +5356,10 @@ class Perrypedia(Source):
 
                             if issues_page_found:
                                 # Get the foreign issue page for that cycle
-                                page = self.browser.open_novisit(url, timeout=30).read().strip()
-                                if page:
+                                soup = self.fetch_soup(self.browser, url, 30, log, loglevel, parts='table')
+                                if soup is not None:
                                     if loglevel in [self.loglevels['DEBUG']]:
                                         log.info('page found with url')
-                                    soup = BeautifulSoup(page, 'html.parser')
                                     # #mw-content-text > div.mw-parser-output > table:nth-child(16)
                                     # selector = 'html body #mw-content-text div.mw-parser-output table.perrypedia_std_table tbody'
                                     # Possibly, there are more than one...
@@ -3332,10 +5549,7 @@ class Perrypedia(Source):
                 custom_title = custom_title.replace('{series}', '')
             else:
                 custom_title = custom_title.replace('{series}', series_names[series_code])
-        if 'Zyklus:' in overview:
-            cycle = str(overview['Zyklus:'])
-        else:
-            cycle = ''
+        cycle = subseries or ''
         if foreign_cycle:
             cycle = foreign_cycle
         custom_title = custom_title.replace('{cycle}', cycle)
@@ -3382,13 +5596,12 @@ class Perrypedia(Source):
                 url = value[1]
                 # Get the foreign issue info.
                 # This is in some cases a three-step (overview -> cycles -> issues), depending on country/language
-                page = self.browser.open_novisit(url, timeout=30).read().strip()
-                if page:
+                # Every book of a cycle needs the same pages, the parsed pages are shared between concurrent requests
+                soup = self.fetch_soup(self.browser, url, 30, log, loglevel, parts='table')
+                if soup:
                     if loglevel in [self.loglevels['DEBUG']]:
                         log.info('Cycles page found.')
-                    soup = BeautifulSoup(page, 'html.parser')  # page is text
-                    selector = 'html body #mw-content-text div.mw-parser-output table.perrypedia_std_table tbody'
-                    table_body = soup.select_one(selector)
+                    table_body = soup.select_one('table.perrypedia_std_table tbody')
                     if loglevel in [self.loglevels['DEBUG']]:
                         log.info('table_body={0}'.format(table_body))
                     # Loop through the table rows
@@ -3409,11 +5622,10 @@ class Perrypedia(Source):
                             # url=/wiki/Perry_Rhodan_niederl%C3%A4ndisch_ab_Band_1#Cyclus_2:_Atlan_en_Arkon
                             url = url.split('#')[0]
                             # Get the foreign issue page for that cycle
-                            page = self.browser.open_novisit(url, timeout=30).read().strip()
-                            if page:
+                            soup = self.fetch_soup(self.browser, url, 30, log, loglevel, parts='table')
+                            if soup:
                                 if loglevel in [self.loglevels['DEBUG']]:
                                     log.info('page found with url')
-                                soup = BeautifulSoup(page, 'html.parser')
                                 # #mw-content-text > div.mw-parser-output > table:nth-child(16)
                                 # selector = 'html body #mw-content-text div.mw-parser-output table.perrypedia_std_table tbody'
                                 # Possibly, there are more than one...
@@ -3496,10 +5708,10 @@ class Perrypedia(Source):
         if loglevel in [self.loglevels['DEBUG']]:
             log.info('url=', url)
         # page = requests.get(url)
-        page = browser.open_novisit(url, timeout=timeout).read().strip()
+        page = self.fetch_url(browser, url, timeout, log, loglevel).strip()
         # soup = BeautifulSoup(hp.unescape(page.text), 'html.parser')  # unescape funktioniert nicht. warum?
         # soup = BeautifulSoup(page.text, 'html.parser')  # unescape funktioniert nicht. warum?
-        soup = BeautifulSoup(page, 'html.parser')  # unescape funktioniert nicht. warum?
+        soup = parse_html(page, 'book')  # unescape funktioniert nicht. warum?
         # for nbsp in soup.select('NBSP'):
         #     nbsp.replace_with(' ')
         table_div = soup.find('div', {'class': r'perrypedia_std_rframe overview'})
@@ -3515,42 +5727,15 @@ class Perrypedia(Source):
         # srcset="/mediawiki/images/thumb/7/78/A500_1.JPG/540px-A500_1.JPG 1.5x, /mediawiki/images/7/78/A500_1.JPG 2x"></a>
         # https://www.perrypedia.de/wiki/Datei:PR3088.jpg
         # https://www.perrypedia.de/wiki/Datei:A500_1.JPG
-        for url in table_body.find_all('a', class_="image"):
-            if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                log.info(_('Found the relative cover page URL:'), url['href'])  # Found the URL: /wiki/Datei:A500_1.JPG
-        cover_page_url = self.base_url + url['href']
-        if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-            log.info(_('Effective URL:'), cover_page_url)
-        # #mw-content-text > div.mw-parser-output > div.perrypedia_std_rframe.overview > table > tbody > tr:nth-child(2) >
-        # td > div:nth-child(2) > div > div:nth-child(2) > div > div > a
-        # <a href="/wiki/Datei:A500_1.JPG" class="image"><img alt="A500 1.JPG"
-        # src="/mediawiki/images/thumb/7/78/A500_1.JPG/360px-A500_1.JPG" width="360" height="261"
-        # srcset="/mediawiki/images/thumb/7/78/A500_1.JPG/540px-A500_1.JPG 1.5x, /mediawiki/images/7/78/A500_1.JPG 2x"></a>
-        # https://www.perrypedia.de/wiki/Datei:PR3088.jpg
-        # https://www.perrypedia.de/wiki/Datei:A500_1.JPG
-
         # url ist die Adresse der Seite mit dem Cover. Das  Coverbild hat dann z. B. die Adresse:
         # https://www.perrypedia.de/mediawiki/images/8/8d/A024_1.JPG
-        # Also Bildseite parsen:
-        page = browser.open_novisit(cover_page_url, timeout=timeout).read().strip()
-        if page is None:
+        cover_page_hrefs = [url['href'] for url in table_body.find_all('a', class_="image")]
+        if not cover_page_hrefs:
             log.exception(_('Cover page not found.'))
             return ''
-        soup = BeautifulSoup(page, 'html.parser')
-        # <div class="fullImageLink" id="file">
-        # <a href="/mediawiki/images/7/78/A500_1.JPG">
-        # <img alt="Datei:A500 1.JPG" height="510" src="/mediawiki/images/7/78/A500_1.JPG" width="704"/></a>
-        # <div class="mw-filepage-resolutioninfo">Es ist keine höhere Auflösung vorhanden.</div></div>
-        cover_url = ''
-        for div_tag in soup.find_all('div', class_='fullMedia'):  # , id_='file'
-            if loglevel in [self.loglevels['DEBUG']]:
-                log.info('div=', div_tag.text)
-            for a_tag in div_tag.find_all('a', class_='internal', href=True):
-                url = a_tag.attrs.get("href")
-                if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
-                    log.info(_('Found the relative cover URL:'), url)
-                cover_url = base_url + url
-        # <a href="/mediawiki/images/8/ 8d/A024_1.JPG">
+        # The last cover page of the overview is used
+        cover_urls = self.resolve_cover_urls(cover_page_hrefs[-1:], 'fullMedia', browser, timeout, log, loglevel)
+        cover_url = cover_urls[-1] if cover_urls else ''
         if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
             log.info(_('Effective URL:'), cover_url)
 
@@ -3638,14 +5823,17 @@ class Perrypedia(Source):
             log.info(_('Truncate the search string at the error position and search with the substring: {0}.').format(
                 param))
         url = 'https://www.isfdb.org/cgi-bin/se.cgi?' + param
+        if self.known_failure('isfdb', title_key(title), log, loglevel):
+            return None
         if loglevel in [self.loglevels['DEBUG'], self.loglevels['INFO']]:
             log.info(_('Title search with: "{0}"...').format(title))
             log.info(_('GET url: "{0}"').format(url))
-        response = browser.open_novisit(url, timeout=timeout)
+        response = self.fetch_url(browser, url, timeout, log, loglevel)
         soup = BeautifulSoup(response, 'html.parser')
         if loglevel in [self.loglevels['DEBUG']]:
             log.info('Page title:', soup.title.text)
         if 'found 0 matches' in soup.text:
+            self.remember_failure('isfdb', title_key(title), log, url)
             return None
         pubdates = []
         table = soup.find_all('tr', {'class': ["table1", "table2"]})
@@ -3712,6 +5900,417 @@ if __name__ == '__main__':  # tests
         return test
 
 
+    # Titles and file names of real books (from the comments of series_regex, the README, debug.txt and the tests
+    # below). More titles can be given in the file PERRYPEDIA_TITLES, one book per line: title<tab>authors.
+    real_titles = [
+        ('Atlan 0629 – Der Geist der Positronik', ''),
+        ('ATLAN 91_93_-Atlan und der Graue', ''),
+        ('atlan - Sb 14 - Imperator von Arkon', ''),
+        ('Atlan - 500', 'Die Solaner'),
+        ('Atlantis-10-Das-Talagon.epub', ''),
+        ('pratlantis01_leseprobe_0.pdf', ''),
+        ('PR Atlantis 11 – Atlantis muss sterben!', ''),
+        ('PRAT12 Leseprobe.indd', ''),
+        ('Perry Rhodan im Bild 05 - Atom-Alarm', ''),
+        ('PR-Storys – Galacto City Band 6: Anschlag auf Galacto City', ''),
+        ('[Perry Rhodan - Planetenromane 0093] • Das Tor zur Überwelt', ''),
+        ('wega01leseprobe_0.pdf', ''),
+        ('PRWE 1221 Leseprobe.indd', ''),
+        ('PR Stellaris 001-010', ''),
+        ('12024017 leseprobe pr yband 3300 web 0', ''),
+        ('12025013 Leseprobe Band 3350 web RZ', ''),
+        ('Perry-Rhodan-3225-Der-Mann-aus-Glas.epub', ''),
+        ('PR 0200 | Die Meister der Insel - Die Straße nach Andromeda - Scheer, K. H.', ''),
+        ('2242-perry rhodan - letoxx der fälscher', 'xyz'),
+        ('prn234', 'xyz'),
+        ('pr 3080 leseprobe', 'Unbekannt'),
+        ('Thalia Leseprobe', ''),
+    ]
+    debug_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'debug.txt')
+    if os.path.isfile(debug_file):
+        with open(debug_file, encoding='utf-8') as f:
+            # Running identify query with parameters: {'title': '...', 'authors': ['...'], ...}
+            for match in re.finditer(r"\{'title': '(.*?)', 'authors': \[(.*?)\]", f.read()):
+                real_titles.append((match.group(1), match.group(2).replace("'", '')))
+    titles_file = os.environ.get('PERRYPEDIA_TITLES')
+    if titles_file:
+        with open(titles_file, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    title, tab, authors_str = line.rstrip('\n').partition('\t')
+                    real_titles.append((title, authors_str))
+
+
+    def compare_series_matcher(table, corpus):
+        """
+        Compare the SeriesMatcher with the sequential re.search loop over table. Returns the list of differences.
+        """
+        matcher = SeriesMatcher(table)
+        differences = []
+        for title, authors_str in corpus:
+            text = title + ' ' + authors_str
+            expected_key, expected = None, None
+            for key, pattern in table:
+                expected = re.search(pattern, text, re.IGNORECASE)
+                if expected:
+                    expected_key = key
+                    break
+            key, match = matcher.search(text)
+            if key != expected_key or (match is not None and (match.span() != expected.span()
+                                                              or match.groups() != expected.groups())):
+                differences.append((text, expected_key, key))
+        return differences
+
+
+    def benchmark_series_matcher(table, corpus, repeat=1000):
+        """
+        Return the seconds for matching corpus repeat times with the sequential re.search loop and with the
+        SeriesMatcher.
+        """
+        start = time.time()
+        for run in range(repeat):
+            for title, authors_str in corpus:
+                text = title + ' ' + authors_str
+                for key, pattern in table:
+                    if re.search(pattern, text, re.IGNORECASE):
+                        break
+        loop_seconds = time.time() - start
+        matcher = SeriesMatcher(table)
+        start = time.time()
+        for run in range(repeat):
+            for title, authors_str in corpus:
+                matcher.search(title + ' ' + authors_str)
+        return loop_seconds, time.time() - start
+
+
+    def series_matcher_corpus(corpus, size=100000, seed=13):
+        """
+        Generate size titles like the file names and titles of real books: series names, codes and keywords of the
+        series tables, subseries (cycle) names, issue numbers and words of the titles of corpus in the common
+        formats ('PR 0200 - Title', 'Perry-Rhodan-3225-Title.epub', 'prn234', 'Title (Atlan 12)'), plus titles
+        without a series. The same seed gives the same corpus.
+        """
+        import random
+        rng = random.Random(seed)
+        keywords = set(Perrypedia.series_names) | set(Perrypedia.series_names.values())
+        for key, pattern in list(Perrypedia.series_regex.items()) + [(subserie[0], subserie[3]) for subserie
+                                                                      in Perrypedia.subseries_offsets]:
+            keywords.update(literal.strip() for literal in required_literals(pattern) or () if literal.strip())
+        keywords.update(subserie[0] for subserie in Perrypedia.subseries_offsets)
+        keywords.update(['Perry Rhodan', 'Perry-Rhodan', 'PR', 'Atlan', 'Silberband', 'Leseprobe', 'Band', 'Heft'])
+        keywords = sorted(keywords)
+        words = set(word for title, authors_str in corpus for word in re.split(r'[\s_\-–|:.\[\]•]+', title)
+                    if word.isalpha())
+        words = sorted(words | {'Überfall', 'Straße', 'Größe', 'Sternenlotsen', 'Yulocs', 'Meister'})
+        authors = [''] + sorted(set(authors_str for title, authors_str in corpus if authors_str)) + [
+            'K. H. Scheer', 'Clark Darlton', 'Andreas Eschbach', 'Kai Hirdt']
+        separators = [' ', ' - ', '-', '_', ' – ', ' | ', ': ', '.', '']
+        suffixes = ['', '', '', '.epub', '.pdf', ' Leseprobe', '_leseprobe_0.pdf', ' Leseprobe.indd', ' web 0']
+
+        def number():
+            issuenumber = str(rng.randint(1, 3500) if rng.random() < 0.7 else rng.randint(1, 99))
+            return issuenumber.zfill(rng.choice((1, 2, 3, 4)))
+
+        def title():
+            return ' '.join(rng.choice(words) for count in range(rng.randint(1, 5)))
+
+        generated = []
+        while len(generated) < size:
+            keyword = rng.choice(keywords)
+            keyword = rng.choice((keyword, keyword.casefold(), keyword.upper(), keyword.replace(' ', '-')))
+            form = rng.randint(0, 5)
+            if form == 0:
+                text = keyword + rng.choice(separators) + number() + rng.choice(separators) + title()
+            elif form == 1:
+                text = number() + rng.choice(separators) + keyword + rng.choice(separators) + title()
+            elif form == 2:
+                text = title() + ' (' + keyword + ' ' + number() + ')'
+            elif form == 3:
+                text = keyword.casefold().replace(' ', '') + number()
+            elif form == 4:
+                text = keyword + rng.choice(separators) + title() + rng.choice(separators) + number()
+            else:
+                text = title()  # no series
+            generated.append((text + rng.choice(suffixes), rng.choice(authors)))
+        return generated
+
+
+    def title_matcher_corpus(size=30000, seed=12):
+        """
+        Generate size (ppid, title) pairs, about the size of the title index, from the words of the real titles and
+        of the saved foreign issue table in debug.txt (Dutch and German titles). The same seed gives the same corpus.
+        """
+        import random
+        rng = random.Random(seed)
+        text = ' '.join(title for title, authors_str in real_titles)
+        if os.path.isfile(debug_file):
+            with open(debug_file, encoding='utf-8') as f:
+                text = text + ' ' + re.sub(r'<[^>]+>', ' ', f.read())
+        words = sorted(set(re.findall(r'\b[^\W\d_]{3,}\b', text)))
+        small_words = ['der', 'die', 'das', 'von', 'im', 'und', 'am', 'aus', 'zum', 'des', 'den']
+        return [('PR{0}'.format(number), ' '.join(rng.choice(words) if rng.random() < 0.75 else rng.choice(small_words)
+                                                  for count in range(rng.randint(2, 5))))
+                for number in range(size)]
+
+
+    def benchmark_title_matcher(matcher, queries, min_score):
+        """
+        Return the mean and the worst seconds of a search for queries.
+        """
+        worst = 0.0
+        start = time.time()
+        for query in queries:
+            query_start = time.time()
+            matcher.search(query, min_score=min_score)
+            worst = max(worst, time.time() - query_start)
+        return (time.time() - start) / len(queries), worst
+
+
+    def adversarial_inputs(pattern, length):
+        """
+        Texts of about length characters, that make a backtracking regex engine work hard: repetitions of the
+        keywords of the pattern without the parts needed for a match (numbers, separators) and long runs of one
+        character.
+        """
+        keywords = [literal.strip() for literal in required_literals(pattern) or () if literal.strip()]
+        keywords = keywords + ['perry rhodan', 'perry', 'rhodan', 'pr', 'leseprobe', 'band', 'atlan', 'folge']
+        texts = ['a' * length, '1' * length, ' ' * length, '- ' * (length // 2)]
+        for keyword in set(keywords):
+            for separator in (' ', '-', '.', ' - '):
+                unit = keyword + separator
+                texts.append(unit * max(1, length // len(unit)))
+        return texts
+
+
+    def audit_series_patterns(table, length=2000, factor=4, max_seconds=0.05):
+        """
+        Measure the worst-case search time of every pattern of table on adversarial inputs of length and
+        factor * length characters (best of three runs per input). Returns [(key, seconds, growth, slow)], worst
+        first. A pattern is slow, if its worst time exceeds max_seconds or grows much faster than the input (more
+        than factor ** 1.5).
+        """
+        report = []
+        for key, pattern in table:
+            regex = re.compile(pattern, re.IGNORECASE)
+            worst = {}
+            for size in (length, length * factor):
+                worst[size] = 0.0
+                for text in adversarial_inputs(pattern, size):
+                    # Best of a few runs, so that a single hiccup of the machine does not count as slow
+                    seconds = float('inf')
+                    for run in range(3):
+                        start = time.time()
+                        regex.search(text)
+                        seconds = min(seconds, time.time() - start)
+                    worst[size] = max(worst[size], seconds)
+            growth = worst[length * factor] / max(worst[length], 1e-6)
+            slow = worst[length * factor] > max_seconds or (growth > factor ** 1.5 and worst[length * factor] > 0.005)
+            report.append((key, worst[length * factor], growth, slow))
+        report.sort(key=lambda entry: -entry[1])
+        return report
+
+
+    def benchmark_html_parsing(directory, repeat=3):
+        """
+        Parse the saved pages <parts>_<name>.html of directory (e. g. book_PR2038.html, cover_PR2038.jpg.html,
+        table_PR_niederlaendisch.html) fully with html.parser and with parse_html(). Returns
+        {parts: (number of pages, html.parser seconds, parse_html seconds)}.
+        """
+        results = {}
+        for file_name in sorted(os.listdir(directory)):
+            parts = file_name.split('_')[0]
+            if parts not in PAGE_PARTS or not file_name.endswith('.html'):
+                continue
+            with open(os.path.join(directory, file_name), encoding='utf-8') as f:
+                page = f.read()
+            timings = []
+            for parse in (lambda: BeautifulSoup(page, 'html.parser'), lambda: parse_html(page, parts)):
+                start = time.time()
+                for run in range(repeat):
+                    parse()
+                timings.append((time.time() - start) / repeat)
+            pages, full_seconds, parts_seconds = results.get(parts, (0, 0.0, 0.0))
+            results[parts] = (pages + 1, full_seconds + timings[0], parts_seconds + timings[1])
+        return results
+
+
+    def compare_parsers(directory):
+        """
+        Parse the saved pages <parts>_<name>.html of directory with parse_html() and fully with html.parser and
+        compare the parts of the page, that the plugin reads: name, text and link of every tag. Returns the number
+        of pages and the differences [(file name, parse_html tags, html.parser tags)].
+        """
+        finders = {
+            'book': lambda soup: [soup.find(id='firstHeading'), soup.find(id='mw-content-text')],
+            'heading': lambda soup: [soup.find(id='firstHeading')],
+            'cover': lambda soup: soup.find_all('div', attrs={'class': ['fullMedia', 'fullImageLink']}),
+            'table': lambda soup: soup.find_all('table', attrs={'class': 'perrypedia_std_table'}),
+        }
+
+        def tags(soup, parts):
+            return [(tag.name, ' '.join(tag.get_text().split()), tag.get('href') or tag.get('src'))
+                    for element in finders[parts](soup) if element is not None
+                    for tag in [element] + element.find_all(True)]
+
+        pages = 0
+        differences = []
+        for file_name in sorted(os.listdir(directory)):
+            parts = file_name.split('_')[0]
+            if parts not in PAGE_PARTS or not file_name.endswith('.html'):
+                continue
+            with open(os.path.join(directory, file_name), encoding='utf-8') as f:
+                page = f.read()
+            pages = pages + 1
+            expected = tags(BeautifulSoup(page, 'html.parser'), parts)
+            found = tags(parse_html(page, parts), parts)
+            if found != expected:
+                differences.append((file_name, found, expected))
+        return pages, differences
+
+
+    def capture_book_pages(plugin, directory, ppids):
+        """
+        Save the rendered book page (book_<ppid>.html) and its wikitext (wikitext_<ppid>.txt) of each ppid in
+        directory, for compare_overviews() and benchmark_html_parsing().
+        """
+        for ppid in ppids:
+            page = plugin.fetch_url(plugin.browser, plugin.base_url + '/wiki/Quelle:' + ppid, 30, use_cache=False)
+            with open(os.path.join(directory, 'book_{0}.html'.format(ppid)), 'wb') as f:
+                f.write(page)
+            response = json.loads(plugin.fetch_url(plugin.browser, plugin.wikitext_url('Quelle:' + ppid), 30,
+                                                   use_cache=False))
+            with open(os.path.join(directory, 'wikitext_{0}.txt'.format(ppid)), 'w', encoding='utf-8') as f:
+                f.write(response['parse']['wikitext'])
+
+
+    def compare_overviews(plugin, directory):
+        """
+        Compare the overview from the wikitext (parse_overview_template) with the overview of the rendered page
+        (parse_pp_book_page) for every pair book_<ppid>.html / wikitext_<ppid>.txt in directory.
+        Returns the number of pairs and the differences [(ppid, label, wikitext value, page value)].
+        """
+        class TestLog(object):
+            def info(self, *args):
+                pass
+            error = exception = info
+        log = TestLog()
+        plugin.resolve_cover_urls = lambda cover_page_hrefs, *args: []  # no downloads, the covers are not compared
+        pairs = 0
+        differences = []
+        for file_name in sorted(os.listdir(directory)):
+            match = re.match(r'^wikitext_(.+)\.txt$', file_name)
+            book_file = os.path.join(directory, 'book_{0}.html'.format(match.group(1))) if match else None
+            if book_file is None or not os.path.isfile(book_file):
+                continue
+            ppid = match.group(1)
+            with open(os.path.join(directory, file_name), encoding='utf-8') as f:
+                template_overview, file_names = plugin.parse_overview_template(f.read(), log, 'INFO')
+            with open(book_file, encoding='utf-8') as f:
+                page_overview = plugin.parse_pp_book_page(parse_html(f.read(), 'book'), None, 30,
+                                                          'Quelle:' + ppid, log, 'INFO')[0]
+            pairs = pairs + 1
+            if template_overview is None:
+                differences.append((ppid, None, None, 'no overview template'))
+                continue
+            for label in sorted(set(template_overview) | set(page_overview)):
+                if template_overview.get(label) != page_overview.get(label):
+                    differences.append((ppid, label, template_overview.get(label), page_overview.get(label)))
+        return pairs, differences
+
+
+    # The compiled series matchers must give the same results as the sequential re.search loops, on the real titles
+    # and on a generated corpus of 100k titles
+    corpus = series_matcher_corpus(real_titles)
+    for table_name, table in (('series_regex', list(Perrypedia.series_regex.items())),
+                              ('subseries_offsets', [(number, subserie[3]) for number, subserie
+                                                     in enumerate(Perrypedia.subseries_offsets)])):
+        differences = compare_series_matcher(table, real_titles)
+        assert not differences, differences[:10]
+        loop_seconds, matcher_seconds = benchmark_series_matcher(table, real_titles)
+        prints('{0}: {1} titles x 1000, loop {2:.2f} s, matcher {3:.2f} s'.format(table_name, len(real_titles),
+                                                                                 loop_seconds, matcher_seconds))
+        differences = compare_series_matcher(table, corpus)
+        assert not differences, differences[:10]
+        matcher = SeriesMatcher(table)
+        matches = sum(1 for title, authors_str in corpus if matcher.search(title + ' ' + authors_str)[0] is not None)
+        loop_seconds, matcher_seconds = benchmark_series_matcher(table, corpus, repeat=1)
+        prints('{0}: {1} generated titles ({2} matches), loop {3:.2f} s, matcher {4:.2f} s'.format(
+            table_name, len(corpus), matches, loop_seconds, matcher_seconds))
+        # No pattern may backtrack catastrophically on long, adversarial titles
+        audit = audit_series_patterns(table)
+        slow_patterns = [entry for entry in audit if entry[3]]
+        assert not slow_patterns, slow_patterns
+        key, seconds, growth, slow = audit[0]
+        prints('{0}: worst pattern {1}, {2:.4f} s, growth {3:.1f}'.format(table_name, key, seconds, growth))
+
+    # Fuzzy title matching: folding of umlauts, ß, dashes and punctuation, ranking and the cutoff of the title search
+    assert fold_title('Größe – Überfall_der Straße!') == 'groesse ueberfall der strasse'
+    assert fold_title('PR-Storys: Galacto City (Band 6)') == 'pr storys galacto city band 6'
+    assert TitleMatcher.similarity('Die Strasse nach Andromeda', 'Die Straße nach Andromeda') == 1.0
+    matcher = TitleMatcher([('PR3225', 'Der Mann aus Glas'), ('PR1433', 'Brigade der Sternenlotsen'),
+                            ('PR200', 'Die Straße nach Andromeda'), ('PR1', 'Unternehmen Stardust'),
+                            ('PR1150', 'Der Mann aus dem Nichts'), ('PRTB1', 'Der Mann, der aus dem Glas kam')])
+    min_score = Perrypedia.fuzzy_title_min_score
+    ranking = [ppid for ppid, score, title in matcher.search('Der Mann aus Glas', min_score=0.0)]
+    assert ranking[:3] == ['PR3225', 'PRTB1', 'PR1150'], ranking
+    # Title hidden in a file name, misspelled title
+    assert [ppid for ppid, score, title in matcher.search('Perry-Rhodan-3225-Der-Mann-aus-Glas.epub',
+                                                          min_score=min_score)] == ['PR3225']
+    assert [ppid for ppid, score, title in matcher.search('Brigade der Sternenlotzen',
+                                                          min_score=min_score)] == ['PR1433']
+    # Below the cutoff: similar, but other titles
+    assert matcher.search('Unternehmen Sternenstaub', min_score=min_score) == []
+    assert matcher.search('Der Mann', min_score=min_score) == []
+    # At the size of the title index every title finds itself first
+    titles = title_matcher_corpus()
+    matcher = TitleMatcher(titles)
+    queries = [title for ppid, title in titles[:300]]
+    for query in queries:
+        assert matcher.search(query, min_score=min_score)[0][1] == 1.0, query
+    queries = queries + ['Perry-Rhodan-{0}-{1}.epub'.format(ppid[2:], title.replace(' ', '-'))
+                         for ppid, title in titles[300:600]] + [title[:-2] for ppid, title in titles[600:900]]
+    mean, worst = benchmark_title_matcher(matcher, queries, min_score)
+    prints('title matcher: {0} titles, {1} queries, {2:.2f} ms per query, worst {3:.2f} ms'.format(
+        len(matcher), len(queries), mean * 1000, worst * 1000))
+
+    # Categories of book pages, persons and places (search hits that are no book pages are not downloaded)
+    plugin = Perrypedia(None)
+    book_categories = ['Kategorie:Perry Rhodan-Heftroman', 'Kategorie:Atlan-Heftroman', 'Kategorie:Planetenroman',
+                       'Kategorie:Silberband', 'Kategorie:Hörbuch', 'Kategorie:Hörspiel', 'Kategorie:Comic',
+                       'Kategorie:Taschenheft', 'Kategorie:Leihbücher',
+                       'Kategorie:Perry Rhodan-Heftromane (Zyklus 34)', 'Kategorie:Romane von Andreas Eschbach']
+    person_categories = ['Kategorie:Person', 'Kategorie:Terraner', 'Kategorie:Mutant', 'Kategorie:Romanfigur',
+                         'Kategorie:Buchautor', 'Kategorie:Heftromanautor', 'Kategorie:Titelbildzeichner',
+                         'Kategorie:Comiczeichner', 'Kategorie:Hörbuchsprecher', 'Kategorie:Figur aus Romanen']
+    place_categories = ['Kategorie:Planet', 'Kategorie:Ort', 'Kategorie:Stadt', 'Kategorie:Sonnensystem',
+                        'Kategorie:Galaxis', 'Kategorie:Raumschiff', 'Kategorie:Schauplatz in Romanen',
+                        'Kategorie:Romanschauplatz']
+    assert all(plugin.is_book_category(name) for name in book_categories), \
+        [name for name in book_categories if not plugin.is_book_category(name)]
+    assert not any(plugin.is_book_category(name) for name in person_categories + place_categories), \
+        [name for name in person_categories + place_categories if plugin.is_book_category(name)]
+
+    # Saved pages (see benchmark_html_parsing, compare_parsers and compare_overviews) in the directory fixtures or
+    # in PERRYPEDIA_FIXTURES. New pages are saved with PERRYPEDIA_CAPTURE=PR2381,PR1433 (needs network).
+    fixtures = os.environ.get('PERRYPEDIA_FIXTURES') or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                     'fixtures')
+    if os.path.isdir(fixtures):
+        plugin = Perrypedia(None)
+        if os.environ.get('PERRYPEDIA_CAPTURE'):
+            capture_book_pages(plugin, fixtures, os.environ['PERRYPEDIA_CAPTURE'].split(','))
+        # Parsing only the parts of a page must give the same tags as parsing the full page
+        pages, differences = compare_parsers(fixtures)
+        assert not differences, [file_name for file_name, found, expected in differences]
+        prints('{0} pages: {1} with parts and html.parser give the same tags'.format(pages, HTML_PARSER))
+        # The wikitext path must give the same overview as the rendered page
+        pairs, differences = compare_overviews(plugin, fixtures)
+        assert not differences, differences
+        if pairs:
+            prints('{0} book pages: overview from wikitext and html page are the same'.format(pairs))
+        for parts, (pages, full_seconds, parts_seconds) in benchmark_html_parsing(fixtures).items():
+            prints('{0}: {1} pages, html.parser {2:.4f} s, {3} {4:.4f} s per page'.format(
+                parts, pages, full_seconds / pages, HTML_PARSER, parts_seconds / pages))
+
     test_identify_plugin(Perrypedia.name,
                          [
                              # (  # A book with an NA cover